@@ -8,51 +8,46 @@ from telegram.ext import (
     filters,
     CallbackQueryHandler,
     CommandHandler,
+    TypeHandler,
 )
 import os
-from telegram import BotCommand
+from telegram import BotCommand, Update
 # from src.core.service.logger import logger
 import asyncio
 from textwrap import dedent
 from src.core.registry.CallbackRegistry import CallbackRegistry
 from src.core.registry.MessageRegistry import MessageRegistry
+from src.core.database.db.base_database import BaseDatabase
+from src.core.moderation.providers.openai_moderation.openai_provider import OpenAIModerationProvider
+from src.core.moderation.utils.video import VideoProcessor
+from src.core.moderation.utils.image_preprocess import ImagePreprocessor
+from src.core.tools.webhook_server import WebhookServer
+from src.core.tools.sharding import ShardRouter, ShardWorker
+from src.core.database.service.RuleGroupConfig import rule_group_config
 import time
 import initial
 
 
-async def run_bot(application: Application):
-    await application.initialize()
-    await application.start()
-    await application.updater.start_polling()
-    await asyncio.Future()
-
-async def main():
-    # 加载环境变量
-    load_dotenv()
-
-    # 获取bot token
-    bot_token = os.getenv("BOT_TOKEN")
-    if not bot_token:
-        raise ValueError("Bot token not found in environment variables")
-
-    # 初始化处理器
-    # message_handler = MessageHandler()
-    callback_registry = CallbackRegistry()
-
-    # 创建Telegram应用
+def build_application(bot_token: str) -> Application:
+    """创建Telegram应用"""
     proxy = os.getenv("PROXY")
     if proxy:
         # logger.info(f"Using proxy: {proxy}")
-        application = (
+        return (
             Application.builder()
             .token(bot_token)
             .proxy(proxy)
             .get_updates_proxy(proxy)
             .build()
         )
-    else:
-        application = Application.builder().token(bot_token).build()
+    return Application.builder().token(bot_token).build()
+
 
+def add_registry_handlers(application: Application) -> None:
+    """把更新交给 MessageRegistry / CallbackRegistry 分发"""
+    # 初始化处理器
+    # message_handler = MessageHandler()
+    callback_registry = CallbackRegistry()
 
     # 添加消息处理器（处理图片和视频）
     application.add_handler(
@@ -69,6 +64,124 @@ async def main():
         CallbackQueryHandler(callback_registry.dispatch)
     )
 
+
+def create_webhook_server(application: Application, stats=MessageRegistry.get_queue_stats) -> WebhookServer:
+    """根据环境变量创建Webhook服务器"""
+    webhook_url = os.getenv("WEBHOOK_URL")
+    if not webhook_url:
+        raise ValueError("WEBHOOK_URL not found in environment variables")
+    return WebhookServer(
+        application,
+        url=webhook_url,
+        path=os.getenv("WEBHOOK_PATH", "/webhook"),
+        host=os.getenv("WEBHOOK_HOST", "0.0.0.0"),
+        port=int(os.getenv("WEBHOOK_PORT", "8443")),
+        secret_token=os.getenv("WEBHOOK_SECRET"),
+        max_connections=int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "40")),
+        stats=stats,
+    )
+
+
+async def receive_updates(application: Application, stats=MessageRegistry.get_queue_stats) -> None:
+    """接收更新直到被取消, BOT_MODE: polling(默认) 或 webhook"""
+    webhook_server = None
+    try:
+        if os.getenv("BOT_MODE", "polling").lower() == "webhook":
+            webhook_server = create_webhook_server(application, stats)
+            await webhook_server.start()
+        else:
+            await application.updater.start_polling()
+        await asyncio.Future()
+    finally:
+        if webhook_server:
+            await webhook_server.stop()
+
+
+async def run_bot(application: Application, shard_worker: ShardWorker = None):
+    """
+    运行机器人
+
+    shard_worker: 多进程模式下的worker, 从入口进程转发的队列读取更新, 不直接接收Telegram的更新
+    """
+    await application.initialize()
+    await application.start()
+    
+    # 预热数据库连接池
+    if not await BaseDatabase().health_check():
+        print("[WARNING] 数据库连接池健康检查失败")
+    
+    # 创建审核服务的HTTP会话
+    await OpenAIModerationProvider.start_session()
+        
+    try:
+        if shard_worker:
+            # 本进程修改规则组配置后通知其它worker清除缓存
+            rule_group_config.on_change = shard_worker.broadcast_config_change
+            await shard_worker.consume(application, rule_group_config.clear_cache)
+        else:
+            await receive_updates(application)
+    finally:
+        # 停止消息处理队列
+        await MessageRegistry.stop_queue()
+        # 关闭审核服务的HTTP会话
+        await OpenAIModerationProvider.close_session()
+        # 关闭视频解码池和图片预处理线程池
+        VideoProcessor.shutdown_executor()
+        ImagePreprocessor.shutdown_executor()
+        # 关闭数据库连接池
+        await BaseDatabase.close_pool()
+
+
+async def run_ingress(application: Application, router: ShardRouter):
+    """多进程模式的入口进程: 只接收更新并按chat_id转发给worker"""
+    await application.initialize()
+    await application.start()
+    router.start()
+    try:
+        await receive_updates(application, router.get_stats)
+    finally:
+        await asyncio.to_thread(router.stop)
+
+
+async def worker_main(index: int, queues: list):
+    application = build_application(os.getenv("BOT_TOKEN"))
+    add_registry_handlers(application)
+    try:
+        await run_bot(application, ShardWorker(index, queues))
+    except Exception as e:
+        print(f"[ERROR] worker {index} 异常退出: {e}")
+    finally:
+        await application.stop()
+        print(f"worker {index} stopped")
+
+
+def worker_process(index: int, queues: list):
+    """worker进程的入口"""
+    load_dotenv()
+    asyncio.run(worker_main(index, queues))
+
+
+async def main():
+    # 加载环境变量
+    load_dotenv()
+
+    # 获取bot token
+    bot_token = os.getenv("BOT_TOKEN")
+    if not bot_token:
+        raise ValueError("Bot token not found in environment variables")
+
+    # 创建Telegram应用
+    application = build_application(bot_token)
+
+    # BOT_WORKERS > 1 时使用多进程模式: 本进程接收更新, 按chat_id一致性哈希转发给worker进程
+    workers = int(os.getenv("BOT_WORKERS", "1"))
+    router = None
+    if workers > 1:
+        router = ShardRouter(workers, worker_process)
+        application.add_handler(TypeHandler(Update, router.forward))
+    else:
+        add_registry_handlers(application)
+
     # 设置机器人命令
     await application.bot.set_my_commands([
         BotCommand("help", "显示帮助信息"),
@@ -81,7 +194,10 @@ async def main():
     try:
         # logger.info("Bot is starting...")
         print("Bot is starting...")
-        await run_bot(application)
+        if router:
+            await run_ingress(application, router)
+        else:
+            await run_bot(application)
     except Exception as e:
         # logger.error(f"An error occurred: {e}")
         print(f"An error occurred: {e}")
@@ -1,21 +1,31 @@
-from typing import List, Optional
+from typing import Any, List, Optional, Tuple
 from src.core.moderation.providers.base import IModerationProvider
 from src.core.database.service.RuleGroupConfig import rule_group_config
 from src.core.database.service.UserModerationConfigKeys import UserModerationConfigKeys as configkey
 from src.core.moderation.types.CategoryTypes import CategorySettings
 from src.core.moderation.manager import ModerationManager
 from src.core.moderation.providers.openai_moderation.openai_provider import OpenAIModerationProvider
+from src.core.moderation.providers.keyword_moderation.keyword_provider import KeywordModerationProvider
+from src.core.moderation.providers.local_moderation.local_provider import LocalImageModerationProvider
 from src.core.moderation.config import ModerationConfig
 from src.core.moderation.types.ModerationTypes import ModerationInputContent, ModerationResult
+from src.core.moderation.cache import ModerationResultCache
+from src.core.moderation.sticker_pack import StickerPackScanner
 
 class RuleGroupModerationConfigMiddleware(ModerationManager):
     """从 rule_group_config 获取审核配置的中间件"""
     
+    # 所有规则组共用一份结果缓存, 命中后按各自的阈值重新计算
+    result_cache = ModerationResultCache()
+    
     def __init__(self):
         providers = [
-            OpenAIModerationProvider()
+            OpenAIModerationProvider(),
+            KeywordModerationProvider(),
+            LocalImageModerationProvider()
         ]
-        super().__init__(providers=providers)
+        super().__init__(providers=providers, cache=self.result_cache)
+        self.sticker_scanner = StickerPackScanner(self)
         
     @staticmethod
     async def get_moderation_config(rule_group_id: str) -> tuple[str, CategorySettings]:
@@ -42,6 +52,124 @@ class RuleGroupModerationConfigMiddleware(ModerationManager):
         
         return current_provider, provider_configs
     
+    @staticmethod
+    async def get_fallback_config(rule_group_id: str) -> Tuple[List[Tuple[str, CategorySettings]], str]:
+        """
+        获取规则组的备用provider链和失败处理方式
+        
+        Returns:
+            tuple: ([(provider名称, provider的分类配置), ...], failure_mode)
+        """
+        fallback_providers = await rule_group_config.get_config(
+            rule_group_id,
+            configkey.moderation.FALLBACK_PROVIDERS
+        ) or []
+        
+        fallbacks = []
+        for provider_name in fallback_providers:
+            provider_configs = await rule_group_config.get_config(
+                rule_group_id,
+                f"{configkey.moderation.PROVIDERS}.{provider_name}"
+            )
+            fallbacks.append((provider_name, provider_configs))
+        
+        failure_mode = await rule_group_config.get_config(
+            rule_group_id,
+            configkey.moderation.other_config.FAILURE_MODE
+        ) or "open"
+        return fallbacks, failure_mode
+    
+    async def _should_skip(self, rule_group_id: str, is_manager: bool) -> bool:
+        """是否跳过审核(管理员消息 & 开启了skip_manager)"""
+        if not is_manager:
+            return False
+        
+        # 获取是否跳过管理员
+        skip_manager = await rule_group_config.get_config(
+            rule_group_id,
+            configkey.moderation.other_config.SKIP_MANAGER
+        )
+        return bool(skip_manager)
+    
+    async def _prefilter(
+        self,
+        rule_group_id: str,
+        content: ModerationInputContent
+    ) -> Optional[ModerationResult]:
+        """
+        本地关键词预过滤, 在远程审核之前执行
+        
+        Returns:
+            命中违禁词或正则时返回结果, 否则返回None继续远程审核
+        """
+        if not content.text:
+            return None
+        
+        keyword_configs = await rule_group_config.get_config(
+            rule_group_id,
+            configkey.moderation.providers.KEYWORD
+        )
+        result = await self.providers["keyword"].check_content(content, keyword_configs)
+        return result if result.flagged else None
+    
+    async def get_cached_content_result(
+        self,
+        rule_group_id: str,
+        file_unique_id: str,
+        is_manager: bool = False
+    ) -> Optional[ModerationResult]:
+        """
+        按 file_unique_id 查询缓存的审核结果, 在下载文件之前调用
+        
+        Args:
+            rule_group_id: 规则组ID
+            file_unique_id: Telegram文件的唯一ID
+            
+        Returns:
+            命中时返回按规则组阈值计算后的结果, 未命中返回None
+        """
+        # 如果skip_manager & is_manager, 则不进行审核
+        if await self._should_skip(rule_group_id, is_manager):
+            print("[INFO] 跳过管理员审核")
+            return ModerationResult(flagged=False)
+        
+        if not rule_group_id:
+            return self.get_cached_result(file_unique_id, "openai", None)
+        
+        current_provider, provider_configs = await self.get_moderation_config(rule_group_id)
+        return self.get_cached_result(file_unique_id, current_provider, provider_configs)
+    
+    async def get_sticker_pack_result(
+        self,
+        rule_group_id: str,
+        sticker: Any,
+        bot: Any,
+        is_manager: bool = False
+    ) -> Optional[ModerationResult]:
+        """
+        从贴纸包预扫描结果中获取贴纸的审核结果, 贴纸包还没有扫描过时在后台开始扫描
+        
+        Returns:
+            有结果时返回按规则组阈值计算后的结果, 否则返回None
+        """
+        if not ModerationConfig.STICKER_PACK_SCAN_ENABLED or not sticker.set_name:
+            return None
+        
+        if await self._should_skip(rule_group_id, is_manager):
+            print("[INFO] 跳过管理员审核")
+            return ModerationResult(flagged=False)
+        
+        current_provider, provider_configs = (
+            await self.get_moderation_config(rule_group_id) if rule_group_id else ("openai", None)
+        )
+        if current_provider != self.sticker_scanner.provider_name:
+            return None
+        
+        result = await self.sticker_scanner.lookup(sticker, provider_configs)
+        if result is None:
+            self.sticker_scanner.schedule_scan(bot, sticker.set_name)
+        return result
+    
     async def check_content(
         self,
         rule_group_id: str,
@@ -53,16 +181,10 @@ class RuleGroupModerationConfigMiddleware(ModerationManager):
         
         Args:
             rule_group_id: 规则组ID
-            content: 审核内容
+            content: 审核内容, content.extra["file_unique_id"] 存在时会写入结果缓存
         """
-        # 获取是否跳过管理员
-        skip_manager = await rule_group_config.get_config(
-            rule_group_id,
-            configkey.moderation.other_config.SKIP_MANAGER
-        )
-        
         # 如果skip_manager & is_manager, 则不进行审核
-        if skip_manager and is_manager:
+        if await self._should_skip(rule_group_id, is_manager):
             print("[INFO] 跳过管理员审核")
             return ModerationResult(flagged=False)
         
@@ -70,6 +192,22 @@ class RuleGroupModerationConfigMiddleware(ModerationManager):
         if not rule_group_id:
             return await super().check_content(content, "openai", None)
         
+        # 明显的违规文本直接在本地判定, 不再请求远程provider
+        result = await self._prefilter(rule_group_id, content)
+        if result is not None:
+            return result
+        
         current_provider, provider_configs = await self.get_moderation_config(rule_group_id)
-        return await super().check_content(content, current_provider, provider_configs)
-    
+        fallbacks, failure_mode = await self.get_fallback_config(rule_group_id)
+        cascade = await rule_group_config.get_config(
+            rule_group_id,
+            configkey.moderation.CASCADE
+        )
+        return await super().check_content(
+            content,
+            current_provider,
+            provider_configs,
+            fallbacks=fallbacks,
+            failure_mode=failure_mode,
+            cascade=cascade
+        )
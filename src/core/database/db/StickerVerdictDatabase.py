@@ -0,0 +1,119 @@
+from typing import Dict, List, Optional, Any
+from src.core.database.db.base_database import BaseDatabase
+import json
+import os
+import time
+
+
+class StickerVerdictDatabase(BaseDatabase):
+    """贴纸包审核结果数据库操作类"""
+
+    def _initialize(self):
+        super()._initialize()
+        self.table_name = "sticker_pack_verdicts"
+        self.scores_table_name = "sticker_scores"
+        if os.getenv("SKIP_DB_INIT", "False") != "True":
+            print("创建贴纸包审核结果表...")
+            self._create_table()
+        else:
+            print("跳过创建贴纸包审核结果表")
+
+    def _create_table(self) -> None:
+        """创建表"""
+        # 贴纸包整体的结果
+        self.execute(f"""
+        CREATE TABLE IF NOT EXISTS {self.table_name} (
+            set_name VARCHAR(64) PRIMARY KEY,
+            provider VARCHAR(32) NOT NULL,
+            total INT NOT NULL,
+            flagged_count INT NOT NULL,
+            flagged BOOLEAN NOT NULL,
+            scores TEXT NOT NULL,
+            scanned_at INT NOT NULL
+        )
+        """)
+        # 每个贴纸的原始分数, 命中时按规则组的阈值重新计算
+        self.execute(f"""
+        CREATE TABLE IF NOT EXISTS {self.scores_table_name} (
+            file_unique_id VARCHAR(64) PRIMARY KEY,
+            set_name VARCHAR(64) NOT NULL,
+            provider VARCHAR(32) NOT NULL,
+            flagged BOOLEAN NOT NULL,
+            response TEXT NOT NULL,
+            created_at INT NOT NULL,
+            INDEX idx_set_name (set_name)
+        )
+        """)
+
+    async def get_pack(self, set_name: str) -> Optional[Dict[str, Any]]:
+        """获取贴纸包的结果, scores 已解析为字典"""
+        sql = f"SELECT * FROM {self.table_name} WHERE set_name = %s"
+        row = await self.fetch_dict(sql, (set_name,))
+        if row:
+            row["scores"] = json.loads(row["scores"])
+        return row
+
+    async def get_sticker(self, file_unique_id: str) -> Optional[Dict[str, Any]]:
+        """获取单个贴纸的结果, response 已解析为字典"""
+        sql = f"SELECT * FROM {self.scores_table_name} WHERE file_unique_id = %s"
+        row = await self.fetch_dict(sql, (file_unique_id,))
+        if row:
+            row["response"] = json.loads(row["response"])
+        return row
+
+    async def save_pack(
+        self,
+        set_name: str,
+        provider: str,
+        stickers: List[Dict[str, Any]],
+        flagged: bool,
+        scores: Dict[str, Any]
+    ) -> bool:
+        """
+        保存贴纸包的扫描结果
+
+        Args:
+            stickers: [{"file_unique_id", "flagged", "response"}, ...]
+            flagged: 贴纸包整体是否违规(按provider自身的判定)
+            scores: 贴纸包每个分类的分数, 格式与provider的原始响应相同, 命中时按规则组的阈值重新计算
+        """
+        now = int(time.time())
+        if stickers:
+            placeholders = ", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(stickers))
+            params = []
+            for sticker in stickers:
+                params.extend([
+                    sticker["file_unique_id"],
+                    set_name,
+                    provider,
+                    sticker["flagged"],
+                    json.dumps(sticker["response"]),
+                    now,
+                ])
+            await self.execute_async(
+                f"""
+                INSERT INTO {self.scores_table_name} (
+                    file_unique_id, set_name, provider, flagged, response, created_at
+                ) VALUES {placeholders}
+                ON DUPLICATE KEY UPDATE
+                    provider = VALUES(provider), flagged = VALUES(flagged),
+                    response = VALUES(response), created_at = VALUES(created_at)
+                """,
+                tuple(params)
+            )
+
+        result = await self.execute_async(
+            f"""
+            INSERT INTO {self.table_name} (
+                set_name, provider, total, flagged_count, flagged, scores, scanned_at
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                provider = VALUES(provider), total = VALUES(total), flagged_count = VALUES(flagged_count),
+                flagged = VALUES(flagged), scores = VALUES(scores), scanned_at = VALUES(scanned_at)
+            """,
+            (
+                set_name, provider, len(stickers), sum(1 for s in stickers if s["flagged"]),
+                flagged, json.dumps(scores), now
+            )
+        )
+        return result is not None
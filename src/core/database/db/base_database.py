@@ -1,4 +1,5 @@
 import os
+import asyncio
 import mysql.connector
 import aiomysql
 from typing import Optional, List, Any, Dict, Tuple
@@ -12,6 +13,9 @@ class BaseDatabase:
     """
     _instances = {}
     _initialized = {}
+    # 进程级共享的异步连接池, 所有子类共用
+    _pool: Optional[aiomysql.Pool] = None
+    _pool_lock: Optional[asyncio.Lock] = None
     
     def __new__(cls, *args, **kwargs):
         if cls not in cls._instances:
@@ -42,9 +46,74 @@ class BaseDatabase:
             "connect_timeout": int(os.getenv("DB_CONNECT_TIMEOUT", 10)),
         }
         
+        # 连接池配置
+        # 多进程模式(BOT_WORKERS > 1)下每个worker各自持有连接池, DB_POOL_MAXSIZE 是所有worker合计的连接数
+        workers = max(1, int(os.getenv("BOT_WORKERS", 1)))
+        maxsize = max(1, int(os.getenv("DB_POOL_MAXSIZE", 10)) // workers)
+        self.POOL_CONFIG = {
+            "minsize": min(int(os.getenv("DB_POOL_MINSIZE", 1)), maxsize),
+            "maxsize": maxsize,
+            # 空闲连接超过该秒数后回收, 避免被MySQL的wait_timeout断开
+            "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 3600)),
+        }
+        
         # 表名（子类需要设置）
         self.table_name = None
         
+    async def get_pool(self) -> aiomysql.Pool:
+        """
+        获取共享连接池, 第一次调用时创建
+        """
+        pool = BaseDatabase._pool
+        if pool is not None and not pool.closed:
+            return pool
+        
+        if BaseDatabase._pool_lock is None:
+            BaseDatabase._pool_lock = asyncio.Lock()
+            
+        async with BaseDatabase._pool_lock:
+            # 双重检查, 防止并发时重复创建
+            if BaseDatabase._pool is None or BaseDatabase._pool.closed:
+                BaseDatabase._pool = await aiomysql.create_pool(
+                    **self.POOL_CONFIG,
+                    # 连接会被复用, 必须开启autocommit, 否则读操作会停留在旧的事务快照中
+                    autocommit=True,
+                    **self.DB_CONFIG
+                )
+                print(
+                    f"[INFO] 数据库连接池已创建: "
+                    f"minsize={self.POOL_CONFIG['minsize']}, maxsize={self.POOL_CONFIG['maxsize']}"
+                )
+        return BaseDatabase._pool
+    
+    async def health_check(self) -> bool:
+        """
+        连接池健康检查, 执行一次 SELECT 1
+        """
+        try:
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
+                await conn.ping(reconnect=True)
+                async with conn.cursor() as cursor:
+                    await cursor.execute("SELECT 1")
+                    return (await cursor.fetchone()) == (1,)
+        except Exception as e:
+            logger.error(f"数据库健康检查失败: {str(e)}", exc_info=True)
+            print(f"[ERROR] 数据库健康检查失败: {str(e)}")
+            return False
+    
+    @classmethod
+    async def close_pool(cls) -> None:
+        """
+        关闭共享连接池, 等待所有连接归还后释放
+        """
+        pool = BaseDatabase._pool
+        BaseDatabase._pool = None
+        if pool is not None and not pool.closed:
+            pool.close()
+            await pool.wait_closed()
+            print("[INFO] 数据库连接池已关闭")
+        
     def execute(self, sql: str, params: tuple = None) -> Optional[int]:
         """
         执行SQL（同步），主要用于创建表等操作
@@ -67,7 +136,8 @@ class BaseDatabase:
         返回最后插入的ID或受影响的行数
         """
         try:
-            async with aiomysql.connect(**self.DB_CONFIG) as conn:
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
                 async with conn.cursor() as cursor:
                     await cursor.execute(sql, params)
                     await conn.commit()
@@ -80,7 +150,8 @@ class BaseDatabase:
     async def fetch_one(self, sql: str, params: tuple = None) -> Optional[tuple]:
         """查询单条记录"""
         try:
-            async with aiomysql.connect(**self.DB_CONFIG) as conn:
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
                 async with conn.cursor() as cursor:
                     await cursor.execute(sql, params)
                     return await cursor.fetchone()
@@ -92,7 +163,8 @@ class BaseDatabase:
     async def fetch_all(self, sql: str, params: tuple = None) -> List[tuple]:
         """查询多条记录"""
         try:
-            async with aiomysql.connect(**self.DB_CONFIG) as conn:
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
                 async with conn.cursor() as cursor:
                     await cursor.execute(sql, params)
                     return await cursor.fetchall()
@@ -104,7 +176,8 @@ class BaseDatabase:
     async def fetch_dict(self, sql: str, params: tuple = None) -> Optional[Dict]:
         """查询单条记录（字典形式）"""
         try:
-            async with aiomysql.connect(**self.DB_CONFIG) as conn:
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
                 async with conn.cursor(aiomysql.DictCursor) as cursor:
                     await cursor.execute(sql, params)
                     return await cursor.fetchone()
@@ -116,7 +189,8 @@ class BaseDatabase:
     async def fetch_all_dict(self, sql: str, params: tuple = None) -> List[Dict]:
         """查询多条记录（字典形式）"""
         try:
-            async with aiomysql.connect(**self.DB_CONFIG) as conn:
+            pool = await self.get_pool()
+            async with pool.acquire() as conn:
                 async with conn.cursor(aiomysql.DictCursor) as cursor:
                     await cursor.execute(sql, params)
                     return await cursor.fetchall()
@@ -1,5 +1,5 @@
 import json
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional
 from src.core.database.service.UserModerationConfigKeys import UserModerationConfigKeys as configkey
 from src.core.database.db.RuleGroupDatabase import RuleGroupDatabase
 
@@ -8,7 +8,9 @@ class RuleGroupConfig:
     """规则组配置管理类"""
     _instance = None
     _config_cache: Dict[str, Dict] = {}  # rule_group_id -> config
-    
+    # 配置被修改后的回调, 多进程模式下用于通知其它worker清除缓存
+    on_change: Optional[Callable[[str], None]] = None
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
@@ -103,9 +105,17 @@ class RuleGroupConfig:
             rule_id=rule_group_id,
             settings=self._config_cache[rule_group_id]
         )
+        self._notify_change(rule_group_id)
         
         return bool(result)
         
+    def _notify_change(self, rule_group_id: str) -> None:
+        if self.on_change:
+            try:
+                self.on_change(rule_group_id)
+            except Exception as e:
+                print(f"[ERROR] 通知配置修改失败: {e}")
+            
     def clear_cache(self, rule_group_id: Optional[str] = None):
         """
         清除配置缓存
@@ -136,6 +146,7 @@ class RuleGroupConfig:
             rule_id=rule_group_id,
             settings=self._default_config
         )
+        self._notify_change(rule_group_id)
         return bool(result)
 
 
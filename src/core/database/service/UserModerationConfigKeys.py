@@ -7,11 +7,20 @@ class UserModerationConfigKeys:
 
         PROVIDER_LIST: str = 'moderation.provider_list'
         ACTIVE_PROVIDER: str = 'moderation.active_provider'
+        FALLBACK_PROVIDERS: str = 'moderation.fallback_providers'
+        
+        # 级联审核: 本地打分在 [lower, upper] 之间的图片才交给远程provider
+        CASCADE: str = 'moderation.cascade'
+        class cascade:
+            ENABLED: str = 'moderation.cascade.enabled'
+            LOWER: str = 'moderation.cascade.lower'
+            UPPER: str = 'moderation.cascade.upper'
         
         # 其他配置
         OTHER_CONFIG: str = 'moderation.other_config'
         class other_config:
             SKIP_MANAGER: str = 'moderation.other_config.skip_manager'
+            FAILURE_MODE: str = 'moderation.other_config.failure_mode'
 
         # 自动处理动作
         AUTO_ACTIONS: str = 'moderation.auto_actions'
@@ -25,6 +34,11 @@ class UserModerationConfigKeys:
         class providers:
             """审核提供者"""
             OPENAI: str = 'moderation.providers.openai'
+            KEYWORD: str = 'moderation.providers.keyword'
+            class keyword:
+                ENABLED: str = 'moderation.providers.keyword.enabled'
+                TERMS: str = 'moderation.providers.keyword.terms'
+                REGEX: str = 'moderation.providers.keyword.regex'
             class openai:
                 CATEGORIES: str = 'moderation.providers.openai.categories'
                 SENSITIVITY: str = 'moderation.providers.openai.sensitivity'
@@ -0,0 +1,61 @@
+# src/core/moderation/cache.py
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+from src.core.moderation.config import ModerationConfig
+
+
+class ModerationResultCache:
+    """
+    审核结果缓存(TTL + LRU)
+
+    缓存的是provider返回的原始分数, 而不是最终的flagged结果,
+    命中时由provider按各规则组的阈值重新计算, 所以同一份缓存可以服务所有规则组
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[int] = None,
+        max_size: Optional[int] = None
+    ):
+        self.ttl = ttl if ttl is not None else ModerationConfig.MODERATION_CACHE_TTL
+        self.max_size = max_size if max_size is not None else ModerationConfig.MODERATION_CACHE_MAX_SIZE
+        # key -> (过期时间, 原始响应)
+        self._cache: "OrderedDict[Hashable, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """获取缓存, 过期则删除并返回None"""
+        item = self._cache.get(key)
+        if item is None:
+            return None
+
+        expire_at, response = item
+        if expire_at < time.monotonic():
+            del self._cache[key]
+            return None
+
+        # 标记为最近使用
+        self._cache.move_to_end(key)
+        return response
+
+    def set(self, key: Hashable, response: Dict[str, Any]) -> None:
+        """写入缓存, 超过容量时淘汰最久未使用的条目"""
+        if self.max_size <= 0:
+            return
+
+        self._cache[key] = (time.monotonic() + self.ttl, response)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """删除缓存"""
+        self._cache.pop(key, None)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._cache.clear()
+
+    def __len__(self) -> int:
+        return len(self._cache)
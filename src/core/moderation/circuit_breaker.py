@@ -0,0 +1,98 @@
+# src/core/moderation/circuit_breaker.py
+
+import asyncio
+import time
+from enum import Enum
+import aiohttp
+from src.core.moderation.config import ModerationConfig
+
+
+class ProviderUnavailableError(ValueError):
+    """provider暂时不可用(网络错误、超时、429、5xx), 只有这类错误计入熔断"""
+
+
+class CircuitOpenError(ProviderUnavailableError):
+    """provider熔断中, 请求没有发出"""
+
+
+def is_provider_outage(error: BaseException) -> bool:
+    """
+    是否是provider不可用导致的错误
+
+    无法准备输入、下载失败、视频损坏或过大等是内容本身的问题, 不计入熔断
+    """
+    return isinstance(error, (ProviderUnavailableError, aiohttp.ClientError, asyncio.TimeoutError))
+
+
+class CircuitState(str, Enum):
+    """熔断器状态"""
+    CLOSED = "closed"        # 正常放行
+    OPEN = "open"            # 熔断中, 直接拒绝
+    HALF_OPEN = "half_open"  # 试探中, 只放行一个请求
+
+
+class CircuitBreaker:
+    """
+    provider熔断器
+
+    连续失败达到阈值后进入OPEN状态, 期间的请求立即失败, 不再等待超时和重试;
+    经过recovery_timeout秒后进入HALF_OPEN, 放行一个试探请求, 成功则恢复, 失败则继续熔断
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = ModerationConfig.MODERATION_BREAKER_FAILURE_THRESHOLD,
+        recovery_timeout: float = ModerationConfig.MODERATION_BREAKER_RECOVERY_SECONDS
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    def allow_request(self) -> bool:
+        """是否允许发送请求"""
+        if self.state == CircuitState.CLOSED:
+            return True
+
+        if self.state == CircuitState.OPEN:
+            if time.monotonic() - self.opened_at < self.recovery_timeout:
+                return False
+            self.state = CircuitState.HALF_OPEN
+            self._trial_in_flight = False
+
+        # HALF_OPEN: 同一时间只放行一个试探请求
+        if self._trial_in_flight:
+            return False
+        self._trial_in_flight = True
+        return True
+
+    @property
+    def in_trial(self) -> bool:
+        """是否处于HALF_OPEN状态, 此时 allow_request 放行的请求就是试探请求"""
+        return self.state == CircuitState.HALF_OPEN
+
+    def release_trial(self) -> None:
+        """
+        释放试探名额, 不改变状态
+
+        试探请求被取消或因内容本身的问题失败时调用, 否则HALF_OPEN会一直拒绝请求
+        """
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        """请求成功"""
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """请求失败"""
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == CircuitState.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != CircuitState.OPEN:
+                print(f"[WARNING] 熔断器打开, 连续失败 {self.failures} 次")
+            self.state = CircuitState.OPEN
+            self.opened_at = time.monotonic()
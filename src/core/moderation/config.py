@@ -3,6 +3,14 @@ import os
 
 load_dotenv()
 
+
+def _per_worker(total: int, workers: int) -> int:
+    """把总额度平分给每个worker进程, 0(不限制)保持不变"""
+    if total <= 0:
+        return total
+    return max(1, total // workers)
+
+
 class ModerationConfig:
     """审核配置"""
     # OPENAI
@@ -10,6 +18,118 @@ class ModerationConfig:
     OPENAI_MODERATION_MODEL = os.getenv("OPENAI_MODERATION_MODEL", "omni-moderation-latest")
     OPENAI_API_BASE = os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1")
     
-    # 视频帧间隔
+    # OPENAI HTTP连接
+    OPENAI_CONNECTION_LIMIT = int(os.getenv("OPENAI_CONNECTION_LIMIT", '100'))
+    OPENAI_CONNECTION_LIMIT_PER_HOST = int(os.getenv("OPENAI_CONNECTION_LIMIT_PER_HOST", '20'))
+    OPENAI_DNS_CACHE_TTL = int(os.getenv("OPENAI_DNS_CACHE_TTL", '300'))
+    OPENAI_KEEPALIVE_TIMEOUT = float(os.getenv("OPENAI_KEEPALIVE_TIMEOUT", '60'))
+    OPENAI_REQUEST_TIMEOUT = float(os.getenv("OPENAI_REQUEST_TIMEOUT", '30'))
+    
+    # 多进程模式(BOT_WORKERS > 1)下每个worker进程各自限流,
+    # OPENAI_RPM / OPENAI_TPM 填写的是整个API key的额度, 每个worker只使用其中的 1/BOT_WORKERS
+    BOT_WORKERS = max(1, int(os.getenv("BOT_WORKERS", '1')))
+    
+    # OPENAI 限流: 每分钟请求数/token数(0表示不限制), 突发量(秒), 重试次数和退避时间(秒)
+    OPENAI_RPM = _per_worker(int(os.getenv("OPENAI_RPM", '500')), BOT_WORKERS)
+    OPENAI_TPM = _per_worker(int(os.getenv("OPENAI_TPM", '0')), BOT_WORKERS)
+    OPENAI_RATE_BURST_SECONDS = float(os.getenv("OPENAI_RATE_BURST_SECONDS", '10'))
+    OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", '5'))
+    OPENAI_BACKOFF_BASE = float(os.getenv("OPENAI_BACKOFF_BASE", '1'))
+    OPENAI_BACKOFF_MAX = float(os.getenv("OPENAI_BACKOFF_MAX", '30'))
+    # 估算token时, 每张图片按多少token计算
+    OPENAI_IMAGE_TOKEN_ESTIMATE = int(os.getenv("OPENAI_IMAGE_TOKEN_ESTIMATE", '85'))
+
+    # OPENAI 对冲请求: 超过最近耗时的分位数仍未返回时, 再发一个相同的请求, 取先返回的结果
+    OPENAI_HEDGE_ENABLED = os.getenv("OPENAI_HEDGE_ENABLED", "False").lower() == "true"
+    OPENAI_HEDGE_PERCENTILE = float(os.getenv("OPENAI_HEDGE_PERCENTILE", '0.9'))
+    OPENAI_HEDGE_MAX_RATIO = float(os.getenv("OPENAI_HEDGE_MAX_RATIO", '0.05'))  # 对冲请求占比上限
+    OPENAI_HEDGE_WINDOW = int(os.getenv("OPENAI_HEDGE_WINDOW", '200'))  # 统计耗时的请求数
+    OPENAI_HEDGE_MIN_SAMPLES = int(os.getenv("OPENAI_HEDGE_MIN_SAMPLES", '20'))
+
+    # provider熔断: 连续失败多少次后熔断, 熔断多少秒后试探恢复
+    MODERATION_BREAKER_FAILURE_THRESHOLD = int(os.getenv("MODERATION_BREAKER_FAILURE_THRESHOLD", '5'))
+    MODERATION_BREAKER_RECOVERY_SECONDS = float(os.getenv("MODERATION_BREAKER_RECOVERY_SECONDS", '30'))
+    
+    # 审核结果缓存(按file_unique_id)
+    MODERATION_CACHE_TTL = int(os.getenv("MODERATION_CACHE_TTL", '86400'))
+    MODERATION_CACHE_MAX_SIZE = int(os.getenv("MODERATION_CACHE_MAX_SIZE", '10000'))
+    
+    # 感知哈希近似重复检测
+    PHASH_ENABLED = os.getenv("PHASH_ENABLED", "True").lower() == "true"
+    PHASH_MAX_DISTANCE = int(os.getenv("PHASH_MAX_DISTANCE", '6'))  # 64位哈希的汉明距离
+    PHASH_INDEX_MAX_SIZE = int(os.getenv("PHASH_INDEX_MAX_SIZE", '50000'))
+    # 纹理太少的图片(纯色、过暗)哈希集中在0附近, 互不相关的图片也会相近, 不参与近似匹配:
+    # 哈希中为1(或为0)的位数下限, 缩略灰度图像素的标准差下限
+    PHASH_MIN_BITS = int(os.getenv("PHASH_MIN_BITS", '8'))
+    PHASH_MIN_STDDEV = float(os.getenv("PHASH_MIN_STDDEV", '8'))
+    
+    # 文本微批处理: 合并并发的文本审核请求
+    MODERATION_BATCH_ENABLED = os.getenv("MODERATION_BATCH_ENABLED", "True").lower() == "true"
+    MODERATION_BATCH_MAX_SIZE = int(os.getenv("MODERATION_BATCH_MAX_SIZE", '32'))
+    MODERATION_BATCH_MAX_BYTES = int(os.getenv("MODERATION_BATCH_MAX_BYTES", str(256 * 1024)))
+    MODERATION_BATCH_WAIT_MS = int(os.getenv("MODERATION_BATCH_WAIT_MS", '20'))
+    
+    # 消息处理队列: worker数量(同时处理的消息数), 排队上限, 单个群组的排队上限(超出时等待空位, 不丢弃消息)
+    MODERATION_WORKERS = int(os.getenv("MODERATION_WORKERS", '16'))
+    MODERATION_MAX_PENDING = int(os.getenv("MODERATION_MAX_PENDING", '2000'))
+    MODERATION_MAX_PENDING_PER_CHAT = int(os.getenv("MODERATION_MAX_PENDING_PER_CHAT", '200'))
+    # 执行通道: 同一通道的消息按顺序处理(chat: 按群组, user: 按群组+用户, off: 不限制), 通道数上限
+    # 默认按用户: 足以保证同一用户的警告次数等状态按顺序修改, 又不会让一个慢视频挡住整个群组的文本
+    MODERATION_LANE_MODE = os.getenv("MODERATION_LANE_MODE", "user").lower()
+    MODERATION_MAX_LANES = int(os.getenv("MODERATION_MAX_LANES", '2000'))
+    
+    # 相册(media group): 最后一条消息到达后等待多少秒认为相册已完整
+    ALBUM_TIMEOUT = float(os.getenv("ALBUM_TIMEOUT", '1.5'))
+    
+    # 图片上传前预处理: 缩小到最长边, 重新编码的格式(JPEG/WEBP)和质量, 线程池大小
+    IMAGE_PREPROCESS_ENABLED = os.getenv("IMAGE_PREPROCESS_ENABLED", "True").lower() == "true"
+    IMAGE_MAX_EDGE = int(os.getenv("IMAGE_MAX_EDGE", '768'))
+    IMAGE_FORMAT = os.getenv("IMAGE_FORMAT", "JPEG").upper()
+    IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", '85'))
+    IMAGE_PREPROCESS_WORKERS = int(os.getenv("IMAGE_PREPROCESS_WORKERS", str(min(4, os.cpu_count() or 1))))
+    
+    # 动画贴纸(TGS)渲染的帧数和尺寸, 需要安装 rlottie-python
+    STICKER_TGS_FRAMES = int(os.getenv("STICKER_TGS_FRAMES", '3'))
+    STICKER_TGS_SIZE = int(os.getenv("STICKER_TGS_SIZE", '512'))
+    
+    # 贴纸包预扫描: 同时审核的贴纸数, 每个贴纸包最多扫描的贴纸数,
+    # 违规贴纸占比达到多少时整个贴纸包判定违规, 内存中缓存的贴纸包数量
+    STICKER_PACK_SCAN_ENABLED = os.getenv("STICKER_PACK_SCAN_ENABLED", "True").lower() == "true"
+    STICKER_PACK_SCAN_CONCURRENCY = int(os.getenv("STICKER_PACK_SCAN_CONCURRENCY", '4'))
+    STICKER_PACK_MAX_STICKERS = int(os.getenv("STICKER_PACK_MAX_STICKERS", '120'))
+    STICKER_PACK_FLAG_RATIO = float(os.getenv("STICKER_PACK_FLAG_RATIO", '0.3'))
+    STICKER_PACK_CACHE_SIZE = int(os.getenv("STICKER_PACK_CACHE_SIZE", '10000'))
+    # 贴纸包结果在内存中的缓存时间(秒), 扫描失败的贴纸包多久后可以重新扫描(秒)
+    STICKER_PACK_CACHE_TTL = int(os.getenv("STICKER_PACK_CACHE_TTL", '86400'))
+    STICKER_PACK_RESCAN_SECONDS = int(os.getenv("STICKER_PACK_RESCAN_SECONDS", '3600'))
+    # 预扫描单独限速(每分钟请求数, 0表示不限制), 占用的是 OPENAI_RPM 中的一部分, 不会挤占实时消息的审核
+    STICKER_PACK_SCAN_RPM = _per_worker(int(os.getenv("STICKER_PACK_SCAN_RPM", '50')), BOT_WORKERS)
+    
+    # 渐进式审核: 先审核缩略图(或最小的足够大的图片尺寸), 分数落在不确定区间时才下载原图
+    PROGRESSIVE_ENABLED = os.getenv("PROGRESSIVE_ENABLED", "True").lower() == "true"
+    PROGRESSIVE_MIN_EDGE = int(os.getenv("PROGRESSIVE_MIN_EDGE", '320'))  # 预览图短边的最小像素
+    PROGRESSIVE_ESCALATE_SCORE = float(os.getenv("PROGRESSIVE_ESCALATE_SCORE", '0.2'))  # 最高分不低于该值且未违规时审核原图
+    
+    # 视频抽帧模式: interval(按帧间隔) / time(按时间均匀抽取) / scene(按场景变化抽取)
+    VIDEO_SAMPLING_MODE = os.getenv("VIDEO_SAMPLING_MODE", "time").lower()
+    # 视频帧间隔(interval模式)
     VIDEO_FRAME_INTERVAL = int(os.getenv("VIDEO_FRAME_INTERVAL", '30')) 
+    # 每个视频最多审核的帧数
+    VIDEO_MAX_FRAMES = int(os.getenv("VIDEO_MAX_FRAMES", '8'))
+    # scene模式: 候选帧数量为 VIDEO_MAX_FRAMES 的倍数, 以及直方图差异阈值(Bhattacharyya距离, 0~1)
+    VIDEO_SCENE_CANDIDATE_FACTOR = int(os.getenv("VIDEO_SCENE_CANDIDATE_FACTOR", '4'))
+    VIDEO_SCENE_THRESHOLD = float(os.getenv("VIDEO_SCENE_THRESHOLD", '0.3'))
+    # 视频下载: 最大字节数, 超时时间(秒)
+    VIDEO_MAX_BYTES = int(os.getenv("VIDEO_MAX_BYTES", str(20 * 1024 * 1024)))
+    VIDEO_DOWNLOAD_TIMEOUT = float(os.getenv("VIDEO_DOWNLOAD_TIMEOUT", '60'))
+    # 下载到这么多字节时, 先用部分文件抽取开头的几帧进行预审
+    VIDEO_PREVIEW_BYTES = int(os.getenv("VIDEO_PREVIEW_BYTES", str(1024 * 1024)))
+    VIDEO_PREVIEW_FRAMES = int(os.getenv("VIDEO_PREVIEW_FRAMES", '2'))
+    # 视频解码: 使用进程池(False时使用线程池), 工作进程数, 同时解码的视频数
+    VIDEO_DECODE_USE_PROCESSES = os.getenv("VIDEO_DECODE_USE_PROCESSES", "True").lower() == "true"
+    VIDEO_DECODE_WORKERS = int(os.getenv("VIDEO_DECODE_WORKERS", str(min(4, os.cpu_count() or 1))))
+    VIDEO_DECODE_CONCURRENCY = int(os.getenv("VIDEO_DECODE_CONCURRENCY", str(VIDEO_DECODE_WORKERS)))
+    # 视频帧缩放后的最长边和JPEG质量
+    VIDEO_FRAME_MAX_EDGE = int(os.getenv("VIDEO_FRAME_MAX_EDGE", '512'))
+    VIDEO_FRAME_JPEG_QUALITY = int(os.getenv("VIDEO_FRAME_JPEG_QUALITY", '85'))
 
@@ -1,25 +1,230 @@
 # src/core/moderation/manager.py
 
-from typing import List, Union, Optional
-from src.core.moderation.types.ModerationTypes import ModerationInputContent, ModerationResult
+from typing import List, Union, Optional, Tuple, TypedDict
+from src.core.moderation.types.ModerationTypes import (
+    ModerationInputContent, ModerationResult, ContentType, PROVIDER_FAIL_OPEN, PROVIDER_FAIL_CLOSED
+)
 from src.core.moderation.providers.base import IModerationProvider
 from src.core.moderation.types.CategoryTypes import CategorySettings
+from src.core.moderation.cache import ModerationResultCache
+from src.core.moderation.circuit_breaker import CircuitBreaker, CircuitOpenError, is_provider_outage
+
+# 所有provider都不可用时的处理方式
+FAILURE_MODE_OPEN = "open"      # 放行
+FAILURE_MODE_CLOSED = "closed"  # 按违规处理
+
+
+class CascadeSettings(TypedDict, total=False):
+    """级联审核设置"""
+    enabled: bool
+    provider: str  # 本地打分的provider
+    lower: float   # 分数低于该值直接放行
+    upper: float   # 分数高于该值直接判定违规, 两者之间交给远程provider
 
 class ModerationManager:
     """审核管理器"""
-    
-    def __init__(self, providers: List[IModerationProvider]):
+
+    def __init__(
+        self,
+        providers: List[IModerationProvider],
+        cache: Optional[ModerationResultCache] = None
+    ):
         self.providers = {p.provider_name: p for p in providers}
+        self.cache = cache
+        # 每个provider一个熔断器
+        self.breakers = {name: CircuitBreaker() for name in self.providers}
+        # 级联审核的统计: 本地放行 / 本地判定违规 / 交给远程provider
+        self.cascade_stats = {"passed": 0, "flagged": 0, "escalated": 0}
+
+    def _get_provider(self, provider_name: Optional[str] = None) -> IModerationProvider:
+        """获取provider, 未指定时使用第一个"""
+        if provider_name and provider_name not in self.providers:
+            raise ValueError(f"Provider {provider_name} not found")
+
+        return self.providers[provider_name] if provider_name else next(iter(self.providers.values()))
+
+    def get_cached_result(
+        self,
+        cache_key: str,
+        provider_name: Optional[str] = None,
+        settings: Optional[CategorySettings] = None
+    ) -> Optional[ModerationResult]:
+        """
+        从缓存中获取审核结果, 并按照当前的审核设置重新计算
+
+        Args:
+            cache_key: 缓存键, 一般是Telegram的file_unique_id
+        """
+        if not self.cache or not cache_key:
+            return None
+
+        provider = self._get_provider(provider_name)
+        response = self.cache.get((provider.provider_name, cache_key))
+        if response is None:
+            return None
+        return provider.process_response(response, settings)
+
+    async def _check_with_provider(
+        self,
+        provider: IModerationProvider,
+        content: ModerationInputContent,
+        settings: Optional[CategorySettings] = None
+    ) -> ModerationResult:
+        """使用单个provider审核, 并写入缓存"""
+        # content.extra["file_unique_id"] 存在时, 使用缓存
+        cache_key = content.extra.get("file_unique_id") if isinstance(content, ModerationInputContent) else None
+        cached = self.get_cached_result(cache_key, provider.provider_name, settings)
+        if cached is not None:
+            return cached
+
+        result = await provider.check_content(content, settings)
+
+        # 只缓存原始分数, 阈值在命中时按规则组重新计算
+        if self.cache and cache_key and result.raw_response and "results" in result.raw_response:
+            self.cache.set(
+                (provider.provider_name, cache_key),
+                {
+                    "results": [
+                        {
+                            "flagged": item.get("flagged", False),
+                            "categories": item.get("categories", {}),
+                            "category_scores": item.get("category_scores", {}),
+                        }
+                        for item in result.raw_response.get("results", [])
+                    ]
+                }
+            )
+        return result
+
+    async def check_with_provider(
+        self,
+        provider_name: str,
+        content: ModerationInputContent,
+        settings: Optional[CategorySettings] = None
+    ) -> ModerationResult:
+        """
+        只使用一个provider审核, 经过该provider的熔断器, 不尝试备用provider
+
+        Raises:
+            CircuitOpenError: provider熔断中
+            ProviderUnavailableError: provider不可用, 已计入熔断
+            其它异常: 内容本身的问题, 不计入熔断
+        """
+        breaker = self.breakers[provider_name]
+        # 熔断中的provider直接失败, 不等待超时
+        if not breaker.allow_request():
+            raise CircuitOpenError(f"Provider {provider_name} circuit is open")
+
+        trial = breaker.in_trial
+        try:
+            result = await self._check_with_provider(self.providers[provider_name], content, settings)
+        except BaseException as e:
+            if is_provider_outage(e):
+                breaker.record_failure()
+            elif trial:
+                # 请求被取消或内容本身有问题, 不计入熔断, 但要释放试探名额
+                breaker.release_trial()
+            raise
+
+        breaker.record_success()
+        return result
+
+    async def _check_cascade(
+        self,
+        content: ModerationInputContent,
+        cascade: CascadeSettings
+    ) -> Optional[ModerationResult]:
+        """
+        级联审核的第一级: 用本地provider打分
+        
+        Returns:
+            分数在不确定区间之外时返回本地结果, 否则返回None交给远程provider
+        """
+        provider = self.providers.get(cascade.get("provider", "local"))
+        if provider is None:
+            return None
+        
+        try:
+            result = await provider.check_content(content, None)
+        except Exception as e:
+            print(f"[WARNING] 本地打分失败, 交给远程provider: {str(e)}")
+            return None
+        
+        score = max(result.category_scores.values(), default=None)
+        if score is None:
+            return None
+        if score < cascade.get("lower", 0.0):
+            self.cascade_stats["passed"] += 1
+            result.flagged = False
+            return result
+        if score > cascade.get("upper", 1.0):
+            self.cascade_stats["flagged"] += 1
+            result.flagged = True
+            return result
+        self.cascade_stats["escalated"] += 1
+        return None
 
     async def check_content(
         self,
         content: ModerationInputContent,
         provider_name: Optional[str] = None,
-        settings: Optional[CategorySettings] = None
+        settings: Optional[CategorySettings] = None,
+        fallbacks: Optional[List[Tuple[str, Optional[CategorySettings]]]] = None,
+        failure_mode: Optional[str] = None,
+        cascade: Optional[CascadeSettings] = None
     ) -> ModerationResult:
-        """审核内容"""
-        if provider_name and provider_name not in self.providers:
-            raise ValueError(f"Provider {provider_name} not found")
+        """
+        审核内容
+
+        Args:
+            content: 审核内容
+            provider_name: 首选provider
+            settings: 首选provider的审核设置
+            fallbacks: 首选provider失败或熔断时, 依次尝试的 (provider名称, 审核设置)
+            failure_mode: 所有provider都不可用时的处理方式, open放行 / closed按违规处理, 为空时抛出异常
+                输入错误(无法准备输入、下载失败等)不属于不可用, 总是直接抛出
+            cascade: 级联审核设置, 开启时纯图片先由本地provider打分, 只有不确定的才请求远程provider
+        """
+        if (
+            cascade
+            and cascade.get("enabled")
+            and isinstance(content, ModerationInputContent)
+            and content.type == ContentType.IMAGE_URL
+            and content.text is None
+        ):
+            # 有缓存时不需要本地打分
+            cache_key = content.extra.get("file_unique_id")
+            cached = self.get_cached_result(cache_key, provider_name, settings)
+            if cached is not None:
+                return cached
             
-        provider = self.providers[provider_name] if provider_name else next(iter(self.providers.values()))
-        return await provider.check_content(content,settings)
\ No newline at end of file
+            result = await self._check_cascade(content, cascade)
+            if result is not None:
+                return result
+        
+        chain = [(self._get_provider(provider_name).provider_name, settings)]
+        for name, fallback_settings in fallbacks or []:
+            if name not in self.providers:
+                print(f"[WARNING] 备用provider {name} 不存在, 已跳过")
+                continue
+            if name not in [item[0] for item in chain]:
+                chain.append((name, fallback_settings))
+
+        last_error: Optional[Exception] = None
+        for name, provider_settings in chain:
+            try:
+                return await self.check_with_provider(name, content, provider_settings)
+            except CircuitOpenError as e:
+                last_error = e
+            except Exception as e:
+                # 内容本身的问题换provider也无法解决, 直接抛出
+                if not is_provider_outage(e):
+                    raise
+                last_error = e
+                print(f"[WARNING] Provider {name} 审核失败: {str(e)}")
+
+        if failure_mode == FAILURE_MODE_OPEN:
+            return ModerationResult(flagged=False, provider=PROVIDER_FAIL_OPEN, raw_response={})
+        if failure_mode == FAILURE_MODE_CLOSED:
+            return ModerationResult(flagged=True, provider=PROVIDER_FAIL_CLOSED, raw_response={})
+        raise last_error
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Union
+from typing import Any, Dict, List, Optional, Union
 from src.core.moderation.types.ModerationTypes import ModerationInputContent, ModerationResult
 
 class IModerationProvider(ABC):
@@ -10,6 +10,13 @@ class IModerationProvider(ABC):
         """审核内容"""
         pass
 
+    def process_response(self, response: Dict[str, Any], settings) -> Optional[ModerationResult]:
+        """
+        使用审核设置重新处理原始响应(用于缓存命中)
+        返回None表示该provider不支持从缓存恢复结果
+        """
+        return None
+
     @property
     @abstractmethod
     def provider_name(self) -> str:
@@ -0,0 +1,106 @@
+# src/core/moderation/providers/keyword_moderation/keyword_provider.py
+
+import re
+from collections import OrderedDict
+from typing import List, Optional, Pattern, Tuple, TypedDict
+from src.core.moderation.types.ModerationTypes import ModerationInputContent, ModerationResult
+from src.core.moderation.providers.base import IModerationProvider
+from src.core.moderation.utils.aho_corasick import AhoCorasick
+
+
+class KeywordSettingsType(TypedDict, total=False):
+    """关键词审核设置"""
+    enabled: bool
+    terms: List[str]  # 违禁词, 不区分大小写的子串匹配
+    regex: List[str]  # 正则表达式, 不区分大小写
+
+
+class KeywordMatcher:
+    """编译好的一组违禁词和正则"""
+
+    def __init__(self, terms: List[str], regex: List[str]):
+        self.automaton = AhoCorasick(terms)
+        self.patterns: List[Pattern] = []
+        for pattern in regex:
+            try:
+                self.patterns.append(re.compile(pattern, re.IGNORECASE))
+            except re.error as e:
+                print(f"[WARNING] 无效的正则表达式 {pattern!r}: {str(e)}")
+
+    def match(self, text: str) -> Tuple[List[str], List[str]]:
+        """返回 (命中的违禁词, 命中的正则)"""
+        terms = sorted(self.automaton.find_all(text)) if len(self.automaton) else []
+        patterns = [pattern.pattern for pattern in self.patterns if pattern.search(text)]
+        return terms, patterns
+
+
+class KeywordModerationProvider(IModerationProvider):
+    """
+    本地关键词审核服务提供者
+
+    按规则组配置的违禁词(Aho-Corasick自动机)和正则匹配文本, 不发起网络请求,
+    可作为远程审核之前的预过滤
+    """
+
+    # 编译结果按配置内容缓存, 配置变化时自动重新编译
+    MAX_MATCHERS = 256
+
+    def __init__(self):
+        self._matchers: "OrderedDict[Tuple[Tuple[str, ...], Tuple[str, ...]], KeywordMatcher]" = OrderedDict()
+
+    @property
+    def provider_name(self) -> str:
+        return "keyword"
+
+    def _get_matcher(self, settings: KeywordSettingsType) -> Optional[KeywordMatcher]:
+        """获取设置对应的匹配器, 没有违禁词和正则时返回None"""
+        key = (tuple(settings.get("terms") or []), tuple(settings.get("regex") or []))
+        if not key[0] and not key[1]:
+            return None
+
+        matcher = self._matchers.get(key)
+        if matcher is None:
+            matcher = KeywordMatcher(list(key[0]), list(key[1]))
+            self._matchers[key] = matcher
+            if len(self._matchers) > self.MAX_MATCHERS:
+                self._matchers.popitem(last=False)
+        else:
+            self._matchers.move_to_end(key)
+        return matcher
+
+    def is_enabled(self, settings: Optional[KeywordSettingsType]) -> bool:
+        """设置是否启用并且配置了违禁词或正则"""
+        if not settings or not settings.get("enabled", True):
+            return False
+        return bool(settings.get("terms") or settings.get("regex"))
+
+    async def check_content(
+        self,
+        content: ModerationInputContent,
+        settings: Optional[KeywordSettingsType] = None
+    ) -> ModerationResult:
+        """审核内容, 只检查文本部分"""
+        if isinstance(content, list):
+            content = content[0]
+
+        if not content.text or not self.is_enabled(settings):
+            return ModerationResult(flagged=False, provider=self.provider_name)
+
+        terms, patterns = self._get_matcher(settings).match(content.text)
+        categories = {}
+        category_scores = {}
+        if terms:
+            categories["keyword"] = True
+            category_scores["keyword"] = 1.0
+        if patterns:
+            categories["regex"] = True
+            category_scores["regex"] = 1.0
+
+        return ModerationResult(
+            flagged=bool(terms or patterns),
+            provider=self.provider_name,
+            raw_response={"terms": terms, "regex": patterns},
+            categories=categories,
+            category_scores=category_scores,
+            category_applied_input_types=["text"] if categories else [],
+        )
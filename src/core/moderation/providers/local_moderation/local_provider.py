@@ -0,0 +1,57 @@
+# src/core/moderation/providers/local_moderation/local_provider.py
+
+import asyncio
+from typing import Optional
+from src.core.moderation.types.ModerationTypes import ModerationInputContent, ModerationResult, ContentType
+from src.core.moderation.providers.base import IModerationProvider
+from src.core.moderation.utils.image_loader import load_image
+from src.core.moderation.utils.skin_detector import skin_ratio
+
+
+class LocalImageModerationProvider(IModerationProvider):
+    """
+    本地图片打分服务提供者
+
+    用肤色占比粗略估计图片的NSFW程度, 只在CPU上计算, 不发起审核请求,
+    用于级联审核的第一级; 下载的图片放在 content.extra["image_data"] 中供后续provider复用
+    """
+
+    @property
+    def provider_name(self) -> str:
+        return "local"
+
+    async def check_content(
+        self,
+        content: ModerationInputContent,
+        settings: Optional[float] = None
+    ) -> ModerationResult:
+        """
+        审核内容, 只支持纯图片
+        
+        Args:
+            settings: 违规阈值, 分数超过该值时判定为违规, 为空时不判定违规
+        """
+        if isinstance(content, list):
+            content = content[0]
+
+        if content.type != ContentType.IMAGE_URL or content.text is not None:
+            raise ValueError("Local provider only supports images")
+
+        images = content.extra.get("image_data")
+        if images is None:
+            images = await asyncio.gather(*(load_image(url) for url in content.image_urls or []))
+            images = [image for image in images if image]
+            content.extra["image_data"] = images
+        if not images:
+            raise ValueError("No valid input could be prepared")
+
+        scores = await asyncio.gather(*(asyncio.to_thread(skin_ratio, image) for image in images))
+        score = max(scores)
+        return ModerationResult(
+            flagged=settings is not None and score > settings,
+            provider=self.provider_name,
+            raw_response={},
+            categories={"skin": settings is not None and score > settings},
+            category_scores={"skin": score},
+            category_applied_input_types=["image"],
+        )
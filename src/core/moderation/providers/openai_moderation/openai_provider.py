@@ -5,51 +5,228 @@ import aiohttp
 from src.core.moderation.types.ModerationTypes import ModerationInputContent, ModerationResult, ContentType, ModerationCategory
 from src.core.moderation.utils.video import VideoProcessor
 from src.core.moderation.providers.base import IModerationProvider
-from src.core.tools.base64tools import base64_img_url, bits_to_base64
+from src.core.tools.base64tools import bits_to_base64
 from src.core.tools.task_keeper import TaskKeeper
 import cv2
 import asyncio
-import os
+import time
 from io import BytesIO
 from src.core.moderation.providers.openai_moderation.OpenaiCategoryTypes import OpenAISettingsType
 from src.core.moderation.config import ModerationConfig
+from src.core.moderation.utils.phash import dhash, PerceptualHashIndex
+from src.core.moderation.utils.batcher import MicroBatcher
+from src.core.moderation.utils.rate_limiter import RateLimiter, backoff_delay, parse_retry_after
+from src.core.moderation.utils.hedging import LatencyTracker, HedgeBudget
+from src.core.moderation.utils.image_loader import load_image
+from src.core.moderation.utils.image_preprocess import ImagePreprocessor
+from src.core.moderation.circuit_breaker import ProviderUnavailableError
+
+
+class OpenAIAPIError(ValueError):
+    """OpenAI API返回的错误"""
+    
+    def __init__(self, message: str, status: int, retryable: bool, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retryable = retryable
+        self.retry_after = retry_after
+
 
 class OpenAIModerationProvider(IModerationProvider):
     """OpenAI审核服务提供者"""
     
+    # 进程级共享的HTTP会话, 复用keep-alive连接和TLS会话
+    _session: Optional[aiohttp.ClientSession] = None
+    # 进程级共享的近似重复图片索引(感知哈希 -> 原始分数), 只保存违规图片
+    _phash_index = PerceptualHashIndex(
+        max_distance=ModerationConfig.PHASH_MAX_DISTANCE,
+        max_size=ModerationConfig.PHASH_INDEX_MAX_SIZE,
+        min_bits=ModerationConfig.PHASH_MIN_BITS,
+    )
+    # 进程级共享的限流器, 额度是按API key计算的, 多进程模式下每个worker只使用其中一份(见 ModerationConfig.BOT_WORKERS)
+    _rate_limiter = RateLimiter(
+        rpm=ModerationConfig.OPENAI_RPM,
+        tpm=ModerationConfig.OPENAI_TPM,
+        burst_seconds=ModerationConfig.OPENAI_RATE_BURST_SECONDS,
+    )
+    # 进程级共享的请求耗时统计和对冲预算
+    _latency = LatencyTracker(
+        window=ModerationConfig.OPENAI_HEDGE_WINDOW,
+        min_samples=ModerationConfig.OPENAI_HEDGE_MIN_SAMPLES,
+    )
+    _hedge_budget = HedgeBudget(ratio=ModerationConfig.OPENAI_HEDGE_MAX_RATIO)
+    
     def __init__(self):
         self.api_key = ModerationConfig.OPENAI_API_KEY
         self.model = ModerationConfig.OPENAI_MODERATION_MODEL
         self.api_base = ModerationConfig.OPENAI_API_BASE
         self.base_url = f"{self.api_base}/moderations"
+        
+        # 纯文本以字符串数组的形式合并请求, API会按顺序逐条返回结果
+        # 图文混合的数组会被API当成一条输入, 所以图片不参与合并
+        self._text_batcher = MicroBatcher(
+            self._request_text_batch,
+            max_batch_size=ModerationConfig.MODERATION_BATCH_MAX_SIZE,
+            max_batch_bytes=ModerationConfig.MODERATION_BATCH_MAX_BYTES,
+            max_wait=ModerationConfig.MODERATION_BATCH_WAIT_MS / 1000,
+        )
 
     @property
     def provider_name(self) -> str:
         return "openai"
 
-    async def _make_request(self, inputs: List[Dict], max_retries: int = 3) -> Dict:
-        """发送请求到OpenAI API"""
+    @classmethod
+    async def start_session(cls) -> aiohttp.ClientSession:
+        """创建共享的HTTP会话(启动时调用)"""
+        if cls._session is None or cls._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=ModerationConfig.OPENAI_CONNECTION_LIMIT,
+                limit_per_host=ModerationConfig.OPENAI_CONNECTION_LIMIT_PER_HOST,
+                ttl_dns_cache=ModerationConfig.OPENAI_DNS_CACHE_TTL,
+                keepalive_timeout=ModerationConfig.OPENAI_KEEPALIVE_TIMEOUT,
+            )
+            cls._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=ModerationConfig.OPENAI_REQUEST_TIMEOUT),
+            )
+        return cls._session
+
+    @classmethod
+    async def close_session(cls) -> None:
+        """关闭共享的HTTP会话(退出时调用)"""
+        session = cls._session
+        cls._session = None
+        if session is not None and not session.closed:
+            await session.close()
+
+    @staticmethod
+    def _estimate_tokens(inputs: List[Union[str, Dict]]) -> int:
+        """粗略估算请求消耗的token数(按4个字符一个token)"""
+        tokens = 0
+        for item in inputs:
+            if isinstance(item, str):
+                tokens += len(item) // 4 + 1
+            elif item.get("type") == "text":
+                tokens += len(item.get("text") or "") // 4 + 1
+            else:
+                tokens += ModerationConfig.OPENAI_IMAGE_TOKEN_ESTIMATE
+        return tokens
+
+    async def _post(self, inputs: List[Union[str, Dict]]) -> Dict:
+        """发送一次请求, 成功时记录耗时"""
+        session = await self.start_session()
+        started_at = time.monotonic()
+        async with session.post(
+            self.base_url,
+            json={"model": self.model, "input": inputs},
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            }
+        ) as response:
+            self._rate_limiter.update_from_headers(response.headers)
+            if response.status != 200:
+                error_text = await response.text()
+                raise OpenAIAPIError(
+                    f"OpenAI API error: {error_text}",
+                    status=response.status,
+                    retryable=response.status == 429 or response.status >= 500,
+                    retry_after=parse_retry_after(response.headers),
+                )
+            result = await response.json()
+        self._latency.record(time.monotonic() - started_at)
+        return result
+
+    async def _post_hedged(self, inputs: List[Union[str, Dict]], tokens: int) -> Dict:
+        """
+        发送请求, 超过最近耗时的分位数仍未返回时再发一个相同的请求, 取先成功的结果
+        对冲请求同样经过限流器, 且总数受 OPENAI_HEDGE_MAX_RATIO 限制
+        """
+        self._hedge_budget.record_request()
+        delay = self._latency.percentile(ModerationConfig.OPENAI_HEDGE_PERCENTILE)
+        if delay is None:
+            return await self._post(inputs)
+
+        async def send_hedge():
+            await self._rate_limiter.acquire(tokens)
+            return await self._post(inputs)
+
+        primary = TaskKeeper.create_task(self._post(inputs))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and self._hedge_budget.try_acquire():
+                tasks.add(TaskKeeper.create_task(send_hedge()))
+
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            # 都失败时抛出主请求的错误
+            return primary.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _make_request(
+        self,
+        inputs: List[Union[str, Dict]],
+        max_retries: int = ModerationConfig.OPENAI_MAX_RETRIES
+    ) -> Dict:
+        """
+        发送请求到OpenAI API
+        
+        请求先经过限流器排队; 429和5xx会按 Retry-After 或带抖动的指数退避重试,
+        其它4xx错误直接失败; 开启 OPENAI_HEDGE_ENABLED 时慢请求会被对冲
+        """
         last_error = None
+        tokens = self._estimate_tokens(inputs)
         for attempt in range(max_retries):
+            await self._rate_limiter.acquire(tokens)
             try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(
-                        self.base_url,
-                        json={"model": self.model, "input": inputs},
-                        headers={
-                            "Authorization": f"Bearer {self.api_key}",
-                            "Content-Type": "application/json"
-                        }
-                    ) as response:
-                        if response.status != 200:
-                            error_text = await response.text()
-                            raise ValueError(f"OpenAI API error: {error_text}")
-                        return await response.json()
+                if ModerationConfig.OPENAI_HEDGE_ENABLED:
+                    return await self._post_hedged(inputs, tokens)
+                return await self._post(inputs)
+            except OpenAIAPIError as e:
+                if not e.retryable:
+                    raise
+                last_error = e
+                if e.retry_after is not None:
+                    # 由限流器统一暂停, 其它排队的请求也会一起等待
+                    self._rate_limiter.pause(e.retry_after)
             except Exception as e:
                 last_error = e
-                if attempt == max_retries - 1:
-                    raise ValueError(f"Moderation failed after {max_retries} attempts: {str(last_error)}")
-                await asyncio.sleep(1 * (attempt + 1))  # 指数退避
+                
+            if attempt == max_retries - 1:
+                # 429、5xx、网络错误和超时重试后仍失败, 视为服务不可用
+                raise ProviderUnavailableError(f"Moderation failed after {max_retries} attempts: {str(last_error)}")
+            if not (isinstance(last_error, OpenAIAPIError) and last_error.retry_after is not None):
+                await asyncio.sleep(backoff_delay(
+                    attempt,
+                    ModerationConfig.OPENAI_BACKOFF_BASE,
+                    ModerationConfig.OPENAI_BACKOFF_MAX
+                ))
+
+    async def _request_text_batch(self, texts: List[str]) -> List[Dict]:
+        """一次请求审核多条文本, 拆分为每条文本各自的响应"""
+        response = await self._make_request(texts)
+        return [{"results": [result]} for result in response["results"]]
+
+    async def _load_image(self, url: str) -> Optional[bytes]:
+        """读取图片数据(本地文件或URL)"""
+        return await load_image(url)
+
+    @staticmethod
+    async def _image_input(image_bytes: bytes) -> Dict:
+        """将图片数据缩小、重新编码后转换为API输入"""
+        image_bytes, mime_type = await ImagePreprocessor.prepare(image_bytes)
+        return {
+            "type": "image_url",
+            "image_url": {
+                "url": f"data:{mime_type};base64,{bits_to_base64(BytesIO(image_bytes))}"
+            }
+        }
 
     async def _prepare_input(self, input_data: ModerationInputContent) -> List[Dict]:
         """准备API输入数据"""
@@ -65,31 +242,49 @@ class OpenAIModerationProvider(IModerationProvider):
         # 处理图片输入
         if input_data.image_urls is not None:
             for image_url in input_data.image_urls:
-                url = str(image_url)  # 转换 HttpUrl 为字符串
-                base64_image = None
-                
-            if os.path.exists(url):  # 如果是本地文件路径
-                try:
-                    with open(url, 'rb') as img_file:
-                        base64_image = bits_to_base64(BytesIO(img_file.read()))
-                except Exception as e:
-                    print(f"Error reading local file {url}: {str(e)}")
-            else:  # 假设是URL
-                try:
-                    base64_image = await base64_img_url(url)
-                except Exception as e:
-                    print(f"Error fetching URL {url}: {str(e)}")
-
-            if base64_image:
-                api_inputs.append({
-                    "type": "image_url",
-                    "image_url": {
-                        "url": f"data:image/jpeg;base64,{base64_image}"
-                    }
-                })
+                image_bytes = await self._load_image(image_url)
+                if image_bytes:
+                    api_inputs.append(await self._image_input(image_bytes))
             
         return api_inputs
 
+    async def _check_image(self, image_bytes: bytes) -> Dict:
+        """
+        审核单张图片, 返回API原始响应
+        先计算感知哈希, 与已判定违规的相近图片直接复用其分数, 不再请求API
+
+        正常图片的结果不用于近似匹配: 相近的图片可能只差一小块违规内容,
+        正常结果只通过 file_unique_id 的结果缓存精确复用
+        """
+        image_hash = None
+        if ModerationConfig.PHASH_ENABLED:
+            try:
+                image_hash = await asyncio.to_thread(
+                    dhash, image_bytes, min_stddev=ModerationConfig.PHASH_MIN_STDDEV
+                )
+            except Exception as e:
+                print(f"[WARNING] 计算图片哈希失败: {str(e)}")
+            else:
+                cached = self._phash_index.lookup(image_hash) if image_hash is not None else None
+                if cached is not None:
+                    return cached
+
+        response = await self._make_request([await self._image_input(image_bytes)])
+        results = response.get("results", [])
+        if image_hash is not None and any(item.get("flagged") for item in results):
+            self._phash_index.add(image_hash, {"results": results})
+        return response
+
+    @staticmethod
+    def _merge_responses(responses: List[Dict]) -> Dict:
+        """合并多个响应为一个"""
+        merged_response = {
+            "results": []
+        }
+        for response in responses:
+            merged_response["results"].extend(response["results"])
+        return merged_response
+
     def _process_api_response(self, 
                               response: Dict, 
                               input_data: ModerationInputContent, 
@@ -132,62 +327,116 @@ class OpenAIModerationProvider(IModerationProvider):
         )
 
 
+    def process_response(
+        self,
+        response: Dict,
+        settings: Optional[OpenAISettingsType] = None
+    ) -> ModerationResult:
+        """使用审核设置重新处理原始响应(用于缓存命中)"""
+        return self._process_api_response(response, None, settings)
+
+    async def _check_video(
+        self,
+        content: ModerationInputContent,
+        settings: Optional[OpenAISettingsType] = None
+    ) -> ModerationResult:
+        """
+        审核视频, 每解码出一帧就立即创建审核任务
+        任意一帧判定违规时立即返回, 取消剩余的下载、解码和请求
+        """
+        frames = VideoProcessor.process_video(content.video)
+        
+        async def next_frame():
+            return await frames.__anext__()
+        
+        frame_task: Optional[asyncio.Task] = TaskKeeper.create_task(next_frame())
+        pending = set()
+        valid_results = []
+        unavailable: Optional[ProviderUnavailableError] = None
+        try:
+            while frame_task or pending:
+                waiting = pending | ({frame_task} if frame_task else set())
+                done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                
+                for task in done:
+                    if task is frame_task:
+                        try:
+                            frame = task.result()
+                        except StopAsyncIteration:
+                            frame_task = None
+                            continue
+                        pending.add(TaskKeeper.create_task(self._check_image(frame)))
+                        frame_task = TaskKeeper.create_task(next_frame())
+                        continue
+                    
+                    pending.discard(task)
+                    # 过滤出成功的结果
+                    if task.exception() is not None:
+                        if isinstance(task.exception(), ProviderUnavailableError):
+                            unavailable = task.exception()
+                        continue
+                    valid_results.append(task.result())
+                    
+                    # 有帧违规则整个视频违规, 不必等待其它帧
+                    result = self._process_api_response(task.result(), content, settings)
+                    if result.flagged:
+                        return self._process_api_response(self._merge_responses(valid_results), content, settings)
+        finally:
+            for task in pending:
+                task.cancel()
+            if frame_task:
+                frame_task.cancel()
+                try:
+                    await frame_task
+                except (asyncio.CancelledError, StopAsyncIteration, Exception):
+                    pass
+            await frames.aclose()
+        
+        # 合并所有帧的结果
+        if valid_results:
+            return self._process_api_response(self._merge_responses(valid_results), content, settings)
+        # 所有帧都因服务不可用而失败时, 按不可用处理
+        if unavailable is not None:
+            raise unavailable
+        raise ValueError("No valid frames could be processed")
+
     async def check_content(
         self, 
         content: ModerationInputContent,
         settings: Optional[OpenAISettingsType] = None 
     ) -> ModerationResult:
         """审核内容"""
-        temp_files = []  # 跟踪临时文件
         try:
             if isinstance(content, list):
                 content = content[0]
                 
             if content.type == ContentType.VIDEO:
-                # 处理视频
-                frame_paths = await VideoProcessor.process_video(content.video)
-                temp_files.extend(frame_paths)  # 记录临时文件
-                
-                # 创建所有帧的处理任务
-                async def process_single_frame(frame_path: str):
-                    frame_input = ModerationInputContent(
-                        type=ContentType.IMAGE_URL,
-                        image_urls=[frame_path]
-                    )
-                    api_inputs = await self._prepare_input(frame_input)
-                    if api_inputs:  # 确保有有效的输入
-                        return await self._make_request(api_inputs)
-                    return None
-                
-                # 创建并管理任务
-                tasks = [
-                    TaskKeeper.create_task(process_single_frame(frame_path))
-                    for frame_path in frame_paths
-                ]
-                
-                # 等待所有任务完成
-                all_results = await asyncio.gather(*tasks, return_exceptions=True)
+                return await self._check_video(content, settings)
+            elif content.type == ContentType.IMAGE_URL and content.text is None:
+                # 处理纯图片, 每张图片单独走近似重复索引
+                # 级联审核时本地打分已经下载过图片, 直接复用
+                images = content.extra.get("image_data") or await asyncio.gather(
+                    *(self._load_image(image_url) for image_url in content.image_urls or [])
+                )
+                responses = await asyncio.gather(
+                    *(self._check_image(image_bytes) for image_bytes in images if image_bytes)
+                )
+                if not responses:
+                    raise ValueError("No valid input could be prepared")
                 
-                # 过滤出成功的结果
-                valid_results = [
-                    result for result in all_results 
-                    if result is not None and not isinstance(result, Exception)
-                ]
+                return self._process_api_response(self._merge_responses(responses), content, settings)
+            elif (
+                content.type == ContentType.TEXT
+                and not content.image_urls
+                and content.text
+                and ModerationConfig.MODERATION_BATCH_ENABLED
+            ):
+                # 处理纯文本, 与其它并发的文本合并成一次请求
+                response = await self._text_batcher.submit(content.text)
                 
-                # 合并所有帧的结果
-                if valid_results:
-                    # 合并所有响应为一个
-                    merged_response = {
-                        "results": []
-                    }
-                    for result in valid_results:
-                        merged_response["results"].extend(result["results"])
-                    
-                    return self._process_api_response(merged_response, content, settings)
-                else:
-                    raise ValueError("No valid frames could be processed")
+                return self._process_api_response(response, content, settings)
             else:
-                # 处理普通内容（文本或单张图片）
+                # 处理普通内容（文本或图文混合）
                 api_inputs = await self._prepare_input(content)
                 if not api_inputs:
                     raise ValueError("No valid input could be prepared")
@@ -195,14 +444,7 @@ class OpenAIModerationProvider(IModerationProvider):
                 
                 return self._process_api_response(response, content, settings)
             
+        except ProviderUnavailableError:
+            raise
         except Exception as e:
             raise ValueError(f"Moderation failed: {str(e)}")
-        finally:
-            # 清理临时文件
-            for path in temp_files:
-                try:
-                    if os.path.exists(path):
-                        os.unlink(path)
-                except Exception:
-                    pass  # 忽略清理错误
-
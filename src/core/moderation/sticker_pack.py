@@ -0,0 +1,192 @@
+# src/core/moderation/sticker_pack.py
+
+import asyncio
+import math
+import traceback
+from typing import Any, Dict, List, Optional, Set
+from src.core.database.db.StickerVerdictDatabase import StickerVerdictDatabase
+from src.core.moderation.cache import ModerationResultCache
+from src.core.moderation.circuit_breaker import CircuitOpenError
+from src.core.moderation.config import ModerationConfig
+from src.core.moderation.manager import ModerationManager
+from src.core.moderation.types.CategoryTypes import CategorySettings
+from src.core.moderation.types.ModerationTypes import ModerationResult
+from src.core.moderation.utils.rate_limiter import RateLimiter
+from src.core.moderation.utils.sticker import StickerProcessor
+from src.core.tools.task_keeper import TaskKeeper
+
+
+class StickerPackScanner:
+    """
+    贴纸包预扫描
+
+    第一次见到某个贴纸包时, 在后台拉取整个贴纸包并逐个审核, 保存每个贴纸的原始分数和贴纸包整体的结果;
+    之后该贴纸包的贴纸直接从表中得出结果, 不再请求审核服务
+    """
+
+    def __init__(self, manager: ModerationManager, provider_name: str = "openai"):
+        self.manager = manager
+        self.provider_name = provider_name
+        self.db = StickerVerdictDatabase()
+        # 最近开始扫描的贴纸包, 避免重复扫描; 过期后(例如扫描失败)可以重新扫描
+        self._seen = ModerationResultCache(
+            ttl=ModerationConfig.STICKER_PACK_RESCAN_SECONDS,
+            max_size=ModerationConfig.STICKER_PACK_CACHE_SIZE,
+        )
+        # 贴纸包结果的内存缓存, 只缓存已有的结果
+        self._packs = ModerationResultCache(
+            ttl=ModerationConfig.STICKER_PACK_CACHE_TTL,
+            max_size=ModerationConfig.STICKER_PACK_CACHE_SIZE,
+        )
+        # 预扫描单独限速, 与实时消息共用provider的限流器之外, 再限制扫描占用的额度
+        self._scan_limiter = RateLimiter(
+            rpm=ModerationConfig.STICKER_PACK_SCAN_RPM,
+            burst_seconds=ModerationConfig.OPENAI_RATE_BURST_SECONDS,
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def _get_pack(self, set_name: str) -> Optional[Dict[str, Any]]:
+        pack = self._packs.get(set_name)
+        if pack is None:
+            pack = await self.db.get_pack(set_name)
+            # 不缓存没有结果的情况, 其它worker稍后写入的结果可以被读到
+            if pack is not None:
+                self._packs.set(set_name, pack)
+        return pack
+
+    async def lookup(self, sticker: Any, settings: Optional[CategorySettings] = None) -> Optional[ModerationResult]:
+        """
+        从预扫描结果中获取贴纸的审核结果
+
+        Returns:
+            贴纸有分数时按审核设置重新计算; 只有贴纸包结果时, 按审核设置计算贴纸包的分数, 违规则判定违规;
+            都没有或贴纸包不违规时返回None
+        """
+        if not sticker.set_name:
+            return None
+
+        pack = await self._get_pack(sticker.set_name)
+        if pack is None:
+            return None
+
+        row = await self.db.get_sticker(sticker.file_unique_id)
+        if row is not None and row["provider"] in self.manager.providers:
+            # 写入结果缓存, 下次直接在内存中命中
+            if self.manager.cache:
+                self.manager.cache.set((row["provider"], StickerProcessor.cache_key(sticker)), row["response"])
+            result = self.manager.providers[row["provider"]].process_response(row["response"], settings)
+            if result is not None:
+                return result
+
+        # 没有单个贴纸的分数时, 按当前规则组的阈值判断贴纸包整体是否违规
+        provider = self.manager.providers.get(pack["provider"])
+        if provider is None:
+            return None
+        result = provider.process_response(pack["scores"], settings)
+        if result is not None and result.flagged:
+            result.provider = "sticker_pack"
+            return result
+        return None
+
+    def schedule_scan(self, bot: Any, set_name: Optional[str]) -> None:
+        """第一次见到贴纸包时在后台扫描"""
+        if not set_name or self._seen.get(set_name) is not None:
+            return
+        self._seen.set(set_name, {})
+        TaskKeeper.create_task(self._scan(bot, set_name))
+
+    async def _check_sticker(self, bot: Any, sticker: Any) -> Optional[Dict[str, Any]]:
+        """审核单个贴纸, 返回 {"file_unique_id", "flagged", "response"}, 失败时返回None"""
+        async with self._semaphore:
+            try:
+                await self._scan_limiter.acquire()
+                content = await StickerProcessor.build_content(bot, sticker)
+                result = await self.manager.check_with_provider(self.provider_name, content)
+            except CircuitOpenError:
+                # 审核服务熔断时不再继续扫描
+                return None
+            except Exception as e:
+                print(f"[WARNING] 扫描贴纸 {sticker.file_unique_id} 失败: {str(e)}")
+                return None
+
+        if not result.raw_response or "results" not in result.raw_response:
+            return None
+        return {
+            "file_unique_id": sticker.file_unique_id,
+            "flagged": result.flagged,
+            "response": {
+                "results": [
+                    {
+                        "flagged": item.get("flagged", False),
+                        "categories": item.get("categories", {}),
+                        "category_scores": item.get("category_scores", {}),
+                    }
+                    for item in result.raw_response["results"]
+                ]
+            },
+        }
+
+    @staticmethod
+    def _pack_scores(scanned: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        计算贴纸包每个分类的分数, 格式与provider的原始响应相同
+
+        每个分类取第 k 高的贴纸分数, k 为 STICKER_PACK_FLAG_RATIO 对应的贴纸数量,
+        按任意阈值判定时, 分类违规等价于至少 k 个贴纸在该分类上违规
+        """
+        sticker_scores: Dict[str, List[float]] = {}
+        sticker_categories: Dict[str, int] = {}
+        for sticker in scanned:
+            # 一个贴纸可能有多个结果(例如视频贴纸的多帧), 取每个分类的最大值
+            scores: Dict[str, float] = {}
+            categories: Set[str] = set()
+            for item in sticker["response"]["results"]:
+                for category, score in item.get("category_scores", {}).items():
+                    scores[category] = max(score, scores.get(category, 0.0))
+                    if item.get("categories", {}).get(category):
+                        categories.add(category)
+            for category, score in scores.items():
+                sticker_scores.setdefault(category, []).append(score)
+            for category in categories:
+                sticker_categories[category] = sticker_categories.get(category, 0) + 1
+
+        k = max(1, math.ceil(len(scanned) * ModerationConfig.STICKER_PACK_FLAG_RATIO))
+        flagged_count = sum(1 for sticker in scanned if sticker["flagged"])
+        return {
+            "results": [{
+                "flagged": flagged_count >= k,
+                "categories": {
+                    category: sticker_categories.get(category, 0) >= k for category in sticker_scores
+                },
+                "category_scores": {
+                    category: sorted(scores, reverse=True)[k - 1] if len(scores) >= k else 0.0
+                    for category, scores in sticker_scores.items()
+                },
+            }]
+        }
+
+    async def _scan(self, bot: Any, set_name: str) -> None:
+        """拉取并审核整个贴纸包"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(ModerationConfig.STICKER_PACK_SCAN_CONCURRENCY)
+
+        try:
+            if await self._get_pack(set_name) is not None:
+                return
+
+            sticker_set = await bot.get_sticker_set(set_name)
+            stickers = list(sticker_set.stickers)[:ModerationConfig.STICKER_PACK_MAX_STICKERS]
+            results = await asyncio.gather(*(self._check_sticker(bot, sticker) for sticker in stickers))
+            scanned = [result for result in results if result is not None]
+            # 大部分贴纸审核失败时不保存, STICKER_PACK_RESCAN_SECONDS 后再见到时重新扫描
+            if not scanned or len(scanned) < len(stickers) / 2:
+                print(f"[WARNING] 贴纸包 {set_name} 扫描失败: {len(scanned)}/{len(stickers)}")
+                return
+
+            flagged_count = sum(1 for result in scanned if result["flagged"])
+            scores = self._pack_scores(scanned)
+            flagged = scores["results"][0]["flagged"]
+            await self.db.save_pack(set_name, self.provider_name, scanned, flagged, scores)
+            print(f"[INFO] 贴纸包 {set_name} 扫描完成: {flagged_count}/{len(scanned)} 违规, 整体{'违规' if flagged else '正常'}")
+        except Exception as e:
+            print(f"[ERROR] 扫描贴纸包 {set_name} 失败: {e}, {traceback.format_exc()}")
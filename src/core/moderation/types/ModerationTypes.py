@@ -8,6 +8,10 @@ class ContentType(str, Enum):
     IMAGE_URL = "image_url"
     VIDEO = "video"  # 预留扩展
 
+# 所有provider都不可用时, 按规则组的 failure_mode 给出的结果的provider名称
+PROVIDER_FAIL_OPEN = "fail_open"
+PROVIDER_FAIL_CLOSED = "fail_closed"
+
 class ModerationInputContent(BaseModel):
     """审核输入内容"""
     type: ContentType
@@ -32,6 +36,11 @@ class ModerationResult(BaseModel):
     category_scores: Optional[Dict[str, float]] = {}
     category_applied_input_types: Optional[List[str]] = []
 
+    @property
+    def unavailable(self) -> bool:
+        """审核服务不可用时按 failure_mode 给出的结果, 不是真正的审核结论"""
+        return self.provider in (PROVIDER_FAIL_OPEN, PROVIDER_FAIL_CLOSED)
+
 class ModerationResponse(BaseModel):
     """完整的审核响应"""
     id: str
@@ -0,0 +1,74 @@
+from collections import deque
+from typing import Dict, Iterable, List, Set
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick多模式匹配自动机
+
+    构建一次, 之后每次匹配只需扫描文本一遍, 耗时与关键词数量无关
+    匹配不区分大小写
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        # 节点以下标表示, 0是根节点
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+        for pattern in patterns:
+            if pattern:
+                self._add(pattern)
+        self._build()
+
+    def __len__(self) -> int:
+        return sum(len(output) for output in self._output)
+
+    def _add(self, pattern: str) -> None:
+        node = 0
+        for char in pattern.casefold():
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        if pattern not in self._output[node]:
+            self._output[node].append(pattern)
+
+    def _build(self) -> None:
+        """按层次遍历计算失配指针, 并把失配节点的输出合并进来"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def _step(self, node: int, char: str) -> int:
+        while node and char not in self._goto[node]:
+            node = self._fail[node]
+        return self._goto[node].get(char, 0)
+
+    def search(self, text: str) -> bool:
+        """文本中是否包含任意一个关键词, 命中即返回"""
+        node = 0
+        for char in text.casefold():
+            node = self._step(node, char)
+            if self._output[node]:
+                return True
+        return False
+
+    def find_all(self, text: str) -> Set[str]:
+        """返回文本中出现的所有关键词"""
+        found: Set[str] = set()
+        node = 0
+        for char in text.casefold():
+            node = self._step(node, char)
+            found.update(self._output[node])
+        return found
@@ -0,0 +1,62 @@
+import asyncio
+import traceback
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+from src.core.tools.task_keeper import TaskKeeper
+
+
+class AlbumCollector:
+    """
+    媒体组(相册)收集器
+
+    同一个 media_group_id 的消息会分多次到达, 每收到一条就重置计时,
+    超过 timeout 秒没有新消息(或者达到 max_items 条)时认为相册已完整, 调用 on_complete
+    add 不会等待, 不占用消息处理队列的worker
+    """
+
+    def __init__(
+        self,
+        on_complete: Callable[[Hashable, List[Any]], Awaitable[Any]],
+        timeout: float = 1.5,
+        max_items: int = 10
+    ):
+        """
+        :param on_complete: 相册完整时调用, 参数为 (key, 按到达顺序排列的items)
+        :param timeout: 等待下一条消息的时间(秒)
+        :param max_items: Telegram相册最多10条, 达到后立即处理
+        """
+        self.on_complete = on_complete
+        self.timeout = timeout
+        self.max_items = max_items
+        self._items: Dict[Hashable, List[Any]] = {}
+        self._timers: Dict[Hashable, asyncio.Task] = {}
+
+    def add(self, key: Hashable, item: Any) -> None:
+        """添加一条消息, 并重置该相册的计时"""
+        items = self._items.setdefault(key, [])
+        items.append(item)
+
+        timer = self._timers.pop(key, None)
+        if timer:
+            timer.cancel()
+
+        if len(items) >= self.max_items:
+            TaskKeeper.create_task(self._flush(key))
+        else:
+            self._timers[key] = TaskKeeper.create_task(self._flush_later(key))
+
+    async def _flush_later(self, key: Hashable) -> None:
+        try:
+            await asyncio.sleep(self.timeout)
+        except asyncio.CancelledError:
+            return
+        self._timers.pop(key, None)
+        await self._flush(key)
+
+    async def _flush(self, key: Hashable) -> None:
+        items: Optional[List[Any]] = self._items.pop(key, None)
+        if not items:
+            return
+        try:
+            await self.on_complete(key, items)
+        except Exception as e:
+            print(f"[ERROR] 处理相册 {key} 失败: {e}, {traceback.format_exc()}")
@@ -0,0 +1,85 @@
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+from src.core.tools.task_keeper import TaskKeeper
+
+
+class MicroBatcher:
+    """
+    微批处理器
+
+    收集短时间窗口内并发提交的输入, 合并为一次调用, 再把结果按顺序分发回各个调用方
+    达到数量上限或字节上限时立即发送, 否则最多等待 max_wait 秒
+    """
+
+    def __init__(
+        self,
+        flush_func: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = 32,
+        max_batch_bytes: int = 256 * 1024,
+        max_wait: float = 0.02,
+        size_func: Callable[[Any], int] = lambda item: len(str(item).encode("utf-8")),
+    ):
+        """
+        :param flush_func: 批量处理函数, 接收输入列表, 返回同样长度和顺序的结果列表
+        :param max_batch_size: 每批最多的输入数量
+        :param max_batch_bytes: 每批最多的字节数
+        :param max_wait: 收集窗口(秒)
+        :param size_func: 计算单个输入字节数的函数
+        """
+        self.flush_func = flush_func
+        self.max_batch_size = max_batch_size
+        self.max_batch_bytes = max_batch_bytes
+        self.max_wait = max_wait
+        self.size_func = size_func
+
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._pending_bytes = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def submit(self, item: Any) -> Any:
+        """提交一个输入, 等待它所在批次的结果"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        size = self.size_func(item)
+
+        # 加入后会超出字节上限, 先把已有的发出去
+        if self._pending and self._pending_bytes + size > self.max_batch_bytes:
+            self._flush()
+
+        self._pending.append((item, future))
+        self._pending_bytes += size
+
+        if len(self._pending) >= self.max_batch_size or self._pending_bytes >= self.max_batch_bytes:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """发送当前收集到的批次"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if not self._pending:
+            return
+
+        batch = self._pending
+        self._pending = []
+        self._pending_bytes = 0
+        TaskKeeper.create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        """执行批量调用, 并把结果分发给对应的调用方"""
+        try:
+            results = await self.flush_func([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"Batch result size mismatch: expected {len(batch)}, got {len(results)}")
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
@@ -0,0 +1,50 @@
+from collections import deque
+from typing import Deque, Optional
+
+
+class LatencyTracker:
+    """记录最近的请求耗时, 用于计算分位数"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        """
+        :param window: 保留最近多少次请求的耗时
+        :param min_samples: 样本数少于该值时不给出分位数
+        """
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """返回q分位的耗时(秒), 样本不足时返回None"""
+        if len(self._samples) < self.min_samples:
+            return None
+        samples = sorted(self._samples)
+        index = min(len(samples) - 1, int(q * len(samples)))
+        return samples[index]
+
+
+class HedgeBudget:
+    """
+    对冲请求预算
+
+    每个正常请求积累 ratio 个额度, 每次对冲消耗1个,
+    对冲请求数长期不会超过正常请求数的 ratio 倍; 额度最多积累 max_tokens 个, 限制突发
+    """
+
+    def __init__(self, ratio: float = 0.05, max_tokens: float = 10):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = 0.0
+        self.hedged = 0
+
+    def record_request(self) -> None:
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        self.hedged += 1
+        return True
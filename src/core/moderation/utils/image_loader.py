@@ -0,0 +1,21 @@
+import os
+from typing import Optional
+from src.core.tools.base64tools import get_photo_data
+
+
+async def load_image(url: str) -> Optional[bytes]:
+    """读取图片数据(本地文件或URL), 失败时返回None"""
+    url = str(url)  # 转换 HttpUrl 为字符串
+    if os.path.exists(url):  # 如果是本地文件路径
+        try:
+            with open(url, 'rb') as img_file:
+                return img_file.read()
+        except Exception as e:
+            print(f"Error reading local file {url}: {str(e)}")
+            return None
+    try:  # 假设是URL
+        photo_data = await get_photo_data(url)
+        return photo_data.getvalue() if photo_data else None
+    except Exception as e:
+        print(f"Error fetching URL {url}: {str(e)}")
+        return None
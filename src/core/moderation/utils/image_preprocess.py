@@ -0,0 +1,91 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Optional, Tuple
+from PIL import Image, ImageOps
+from src.core.moderation.config import ModerationConfig
+
+
+class ImagePreprocessor:
+    """
+    上传前的图片预处理: 缩小到provider实际使用的尺寸, 并重新编码为有质量上限的JPEG/WebP
+
+    Pillow解码和缩放时会释放GIL, 在进程级共享的线程池中运行
+    """
+
+    _executor: Optional[ThreadPoolExecutor] = None
+
+    # provider能直接接收的格式; 重新编码后不比原图小时按原格式上传
+    MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp", "PNG": "image/png", "GIF": "image/gif"}
+
+    @staticmethod
+    def shrink(
+        image_bytes: bytes,
+        max_edge: int = ModerationConfig.IMAGE_MAX_EDGE,
+        quality: int = ModerationConfig.IMAGE_QUALITY,
+        image_format: str = ModerationConfig.IMAGE_FORMAT
+    ) -> Tuple[bytes, str]:
+        """
+        缩小并重新编码图片(同步, 需在线程中运行)
+
+        Returns:
+            (图片数据, MIME类型); 重新编码后反而更大时返回原图
+        """
+        with Image.open(BytesIO(image_bytes)) as image:
+            original_format = image.format
+            # 已经是目标格式且尺寸足够小(例如视频帧)时不再重新编码
+            if original_format == image_format and max(image.size) <= max_edge:
+                return image_bytes, ImagePreprocessor.MIME_TYPES[original_format]
+            # 只需要第一帧, draft 让JPEG在解码时就按比例缩小
+            image.draft("RGB", (max_edge, max_edge))
+            image = ImageOps.exif_transpose(image)
+            if image.mode not in ("RGB", "L"):
+                image = image.convert("RGBA")
+                background = Image.new("RGB", image.size, (255, 255, 255))
+                background.paste(image, mask=image.getchannel("A"))
+                image = background
+            image.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+
+            output = BytesIO()
+            image.save(output, format=image_format, quality=quality, optimize=True)
+            data = output.getvalue()
+
+        if len(data) >= len(image_bytes) and original_format in ImagePreprocessor.MIME_TYPES:
+            return image_bytes, ImagePreprocessor.MIME_TYPES[original_format]
+        return data, ImagePreprocessor.MIME_TYPES.get(image_format, "image/jpeg")
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        """获取共享的线程池, 第一次调用时创建"""
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(
+                max_workers=ModerationConfig.IMAGE_PREPROCESS_WORKERS,
+                thread_name_prefix="image-preprocess"
+            )
+        return cls._executor
+
+    @classmethod
+    def shutdown_executor(cls) -> None:
+        """关闭线程池(退出时调用)"""
+        executor = cls._executor
+        cls._executor = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @classmethod
+    async def prepare(cls, image_bytes: bytes) -> Tuple[bytes, str]:
+        """
+        异步预处理图片, 失败时(例如Pillow不支持的格式)返回原图
+
+        Returns:
+            (图片数据, MIME类型)
+        """
+        if not ModerationConfig.IMAGE_PREPROCESS_ENABLED:
+            return image_bytes, "image/jpeg"
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(cls._get_executor(), cls.shrink, image_bytes)
+        except Exception as e:
+            print(f"[WARNING] 图片预处理失败, 使用原图: {str(e)}")
+            return image_bytes, "image/jpeg"
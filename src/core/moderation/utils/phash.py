@@ -0,0 +1,140 @@
+from PIL import Image
+from io import BytesIO
+import statistics
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def dhash(image_bytes: bytes, hash_size: int = 8, min_stddev: float = 0) -> Optional[int]:
+    """
+    计算图片的差值哈希(dHash)
+
+    缩放成 (hash_size + 1) x hash_size 的灰度图, 比较相邻像素的明暗,
+    对重新编码、缩放、轻微调色和小幅裁剪不敏感
+    缩略图像素的标准差低于 min_stddev 时(纯色、过暗的图片)返回None, 这类图片的哈希没有区分度
+    """
+    with Image.open(BytesIO(image_bytes)) as img:
+        # 动图只取第一帧
+        small = img.convert("L").resize((hash_size + 1, hash_size), Image.LANCZOS)
+        pixels = list(small.getdata())
+
+    if min_stddev > 0 and statistics.pstdev(pixels) < min_stddev:
+        return None
+
+    value = 0
+    width = hash_size + 1
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * width + col]
+            right = pixels[row * width + col + 1]
+            value = (value << 1) | (1 if left > right else 0)
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """两个哈希之间的汉明距离"""
+    return bin(a ^ b).count("1")
+
+
+class BKTree:
+    """按汉明距离组织的BK树, 用于查找相近的哈希"""
+
+    def __init__(self):
+        # 节点结构: [hash, value, {distance: child}]
+        self._root: Optional[list] = None
+        self._size = 0
+
+    def add(self, hash_value: int, value: Any) -> None:
+        """插入哈希, 已存在时覆盖value"""
+        if self._root is None:
+            self._root = [hash_value, value, {}]
+            self._size = 1
+            return
+
+        node = self._root
+        while True:
+            distance = hamming_distance(hash_value, node[0])
+            if distance == 0:
+                node[1] = value
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [hash_value, value, {}]
+                self._size += 1
+                return
+            node = child
+
+    def find_nearest(self, hash_value: int, max_distance: int) -> Optional[Tuple[int, Any]]:
+        """查找距离不超过max_distance的最近节点, 返回 (距离, value)"""
+        if self._root is None:
+            return None
+
+        best: Optional[Tuple[int, Any]] = None
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(hash_value, node[0])
+            if distance <= max_distance and (best is None or distance < best[0]):
+                best = (distance, node[1])
+                if distance == 0:
+                    break
+
+            # 三角不等式剪枝: 只需要访问 |d - child_d| <= max_distance 的子树
+            for child_distance, child in node[2].items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        return best
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class PerceptualHashIndex:
+    """
+    近似重复图片索引
+
+    保存已审核图片的哈希和provider的原始分数, 命中时由调用方按规则组阈值重新计算结果;
+    为1(或为0)的位数少于 min_bits 的哈希没有区分度, 不写入也不查找
+    """
+
+    def __init__(self, max_distance: int = 6, max_size: int = 50000, min_bits: int = 0):
+        self.max_distance = max_distance
+        self.max_size = max_size
+        self.min_bits = min_bits
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._tree = BKTree()
+
+    def is_distinctive(self, hash_value: int) -> bool:
+        """哈希是否有足够的区分度(64位哈希中1和0都不少于 min_bits 位)"""
+        bits = bin(hash_value).count("1")
+        return self.min_bits <= bits <= 64 - self.min_bits
+
+    def lookup(self, hash_value: int) -> Optional[Dict[str, Any]]:
+        """查找相近图片的原始响应"""
+        if not self.is_distinctive(hash_value):
+            return None
+        found = self._tree.find_nearest(hash_value, self.max_distance)
+        return found[1] if found else None
+
+    def add(self, hash_value: int, response: Dict[str, Any]) -> None:
+        """写入索引, 超过容量时丢弃最早的一半并重建BK树"""
+        if self.max_size <= 0 or not self.is_distinctive(hash_value):
+            return
+
+        self._entries[hash_value] = response
+        self._entries.move_to_end(hash_value)
+        self._tree.add(hash_value, response)
+
+        if len(self._entries) > self.max_size:
+            keep: List[Tuple[int, Dict[str, Any]]] = list(self._entries.items())[-max(1, self.max_size // 2):]
+            self._entries = OrderedDict(keep)
+            self._tree = BKTree()
+            for key, value in keep:
+                self._tree.add(key, value)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tree = BKTree()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,147 @@
+import asyncio
+import random
+import re
+import time
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """
+    解析OpenAI限流头里的时长, 例如 "1s", "6m0s", "20ms", "1h2m3.5s"
+    返回秒数, 无法解析时返回None
+    """
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value)
+    if not parts:
+        return None
+    unit_seconds = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(number) * unit_seconds[unit] for number, unit in parts)
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """解析 retry-after-ms / Retry-After 头, 返回需要等待的秒数"""
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get("Retry-After")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+    # HTTP日期格式
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """带随机抖动的指数退避(full jitter)"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class TokenBucket:
+    """令牌桶, 按每分钟的速率匀速补充"""
+
+    def __init__(self, per_minute: float, burst_seconds: float = 10):
+        self.rate = per_minute / 60
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def time_until(self, amount: float) -> float:
+        """距离可以取出amount个令牌还需要等待的秒数"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self.tokens -= min(amount, self.capacity)
+
+    def limit_to(self, remaining: float) -> None:
+        """服务端告知的剩余额度比本地少时, 以服务端为准"""
+        self._refill()
+        self.tokens = min(self.tokens, remaining)
+
+
+class RateLimiter:
+    """
+    客户端限流器
+
+    按配置的 RPM/TPM 匀速放行请求, 额度不足时排队等待而不是失败,
+    并根据服务端返回的 x-ratelimit-* 和 Retry-After 头暂停放行
+    """
+
+    def __init__(self, rpm: int = 0, tpm: int = 0, burst_seconds: float = 10):
+        """
+        :param rpm: 每分钟请求数, 0表示不限制
+        :param tpm: 每分钟token数, 0表示不限制
+        :param burst_seconds: 允许的突发量, 以多少秒的额度计算
+        """
+        self.requests = TokenBucket(rpm, burst_seconds) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm, burst_seconds) if tpm > 0 else None
+        self._paused_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def acquire(self, tokens: int = 1) -> None:
+        """等待直到可以发送一个消耗tokens个token的请求, 按到达顺序放行"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            while True:
+                wait = self._paused_until - time.monotonic()
+                if self.requests:
+                    wait = max(wait, self.requests.time_until(1))
+                if self.tokens:
+                    wait = max(wait, self.tokens.time_until(tokens))
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+
+            if self.requests:
+                self.requests.consume(1)
+            if self.tokens:
+                self.tokens.consume(tokens)
+
+    def pause(self, seconds: float) -> None:
+        """暂停放行 seconds 秒"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """根据 x-ratelimit-* 响应头同步剩余额度"""
+        for kind, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            if remaining is None:
+                continue
+            try:
+                remaining = float(remaining)
+            except ValueError:
+                continue
+
+            if bucket:
+                bucket.limit_to(remaining)
+            if remaining <= 0:
+                reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+                if reset:
+                    self.pause(reset)
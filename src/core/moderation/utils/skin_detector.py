@@ -0,0 +1,31 @@
+import cv2
+import numpy as np
+
+
+def skin_ratio(image_bytes: bytes, max_edge: int = 128) -> float:
+    """
+    估算图片中肤色像素的占比(0~1), 用作本地的廉价NSFW打分
+
+    缩小到最长边 max_edge 后, 同时满足 YCrCb 和 HSV 肤色范围的像素记为肤色
+    同步函数, 需在线程中运行
+    """
+    image = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Failed to decode image")
+
+    height, width = image.shape[:2]
+    if max(height, width) > max_edge:
+        scale = max_edge / max(height, width)
+        image = cv2.resize(
+            image,
+            (max(1, int(width * scale)), max(1, int(height * scale))),
+            interpolation=cv2.INTER_AREA
+        )
+
+    ycrcb = cv2.cvtColor(image, cv2.COLOR_BGR2YCrCb)
+    hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+    mask = cv2.bitwise_and(
+        cv2.inRange(ycrcb, (0, 133, 77), (255, 173, 127)),
+        cv2.inRange(hsv, (0, 15, 40), (25, 200, 255))
+    )
+    return float(cv2.countNonZero(mask)) / mask.size
@@ -0,0 +1,117 @@
+import asyncio
+import os
+import tempfile
+from enum import Enum
+from io import BytesIO
+from typing import Any, List
+from PIL import Image
+from src.core.moderation.config import ModerationConfig
+from src.core.moderation.types.ModerationTypes import ModerationInputContent, ContentType
+from src.core.moderation.utils.image_loader import load_image
+
+try:
+    # 可选依赖, 用于把Lottie(TGS)动画渲染成图片; 未安装时使用Telegram生成的缩略图
+    from rlottie_python import LottieAnimation
+except ImportError:
+    LottieAnimation = None
+    print("[WARNING] 未安装 rlottie-python, TGS动画贴纸只能审核Telegram生成的缩略图")
+
+
+class StickerFormat(str, Enum):
+    """贴纸格式"""
+    STATIC = "static"      # WebP静态贴纸
+    ANIMATED = "animated"  # Lottie(TGS)动画贴纸
+    VIDEO = "video"        # WEBM视频贴纸
+
+
+class StickerProcessor:
+    """贴纸处理工具: 按格式转换为可审核的内容"""
+
+    @staticmethod
+    def detect_format(sticker: Any) -> StickerFormat:
+        if getattr(sticker, "is_video", False):
+            return StickerFormat.VIDEO
+        if getattr(sticker, "is_animated", False):
+            return StickerFormat.ANIMATED
+        return StickerFormat.STATIC
+
+    @staticmethod
+    def cache_key(sticker: Any) -> str:
+        """贴纸的缓存键: 贴纸包名 + file_unique_id"""
+        return f"{sticker.set_name or '-'}:{sticker.file_unique_id}"
+
+    @staticmethod
+    def _render_tgs(tgs_path: str, frame_count: int, size: int) -> List[bytes]:
+        """把TGS动画均匀渲染 frame_count 帧, 返回JPEG数据(同步, 需在线程中运行)"""
+        animation = LottieAnimation.from_tgs(tgs_path)
+        total = animation.lottie_animation_get_totalframe()
+        frames = []
+        for i in range(min(frame_count, total)):
+            image = animation.render_pillow_frame(
+                frame_num=int(total * (i + 0.5) / frame_count),
+                width=size,
+                height=size
+            )
+            # 透明背景铺白底
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            output = BytesIO()
+            background.save(output, format="JPEG", quality=ModerationConfig.IMAGE_QUALITY)
+            frames.append(output.getvalue())
+        return frames
+
+    @classmethod
+    async def render_tgs(cls, url: str) -> List[bytes]:
+        """下载并渲染TGS动画贴纸"""
+        data = await load_image(url)
+        if not data:
+            raise ValueError("Failed to download animated sticker")
+
+        temp = tempfile.NamedTemporaryFile(delete=False, suffix=".tgs")
+        try:
+            temp.write(data)
+            temp.close()
+            return await asyncio.to_thread(
+                cls._render_tgs,
+                temp.name,
+                ModerationConfig.STICKER_TGS_FRAMES,
+                ModerationConfig.STICKER_TGS_SIZE
+            )
+        finally:
+            os.unlink(temp.name)
+
+    @classmethod
+    async def build_content(cls, bot: Any, sticker: Any) -> ModerationInputContent:
+        """
+        按贴纸格式构建审核内容
+
+        - WebP静态贴纸: 按图片审核, 上传前由 ImagePreprocessor 转为JPEG
+        - WEBM视频贴纸: 走视频抽帧流程
+        - TGS动画贴纸: 渲染几帧后按图片审核, 没有安装rlottie时审核缩略图
+        """
+        sticker_format = cls.detect_format(sticker)
+        extra = {"file_unique_id": cls.cache_key(sticker), "sticker_format": sticker_format.value}
+
+        if sticker_format == StickerFormat.STATIC:
+            file = await bot.get_file(sticker.file_id)
+            return ModerationInputContent(type=ContentType.IMAGE_URL, image_urls=[file.file_path], extra=extra)
+
+        if sticker_format == StickerFormat.VIDEO:
+            file = await bot.get_file(sticker.file_id)
+            return ModerationInputContent(type=ContentType.VIDEO, video=file.file_path, extra=extra)
+
+        if LottieAnimation is not None:
+            file = await bot.get_file(sticker.file_id)
+            try:
+                frames = await cls.render_tgs(file.file_path)
+            except Exception as e:
+                print(f"[WARNING] 渲染动画贴纸失败, 改为审核缩略图: {str(e)}")
+            else:
+                if frames:
+                    extra["image_data"] = frames
+                    return ModerationInputContent(type=ContentType.IMAGE_URL, image_urls=[], extra=extra)
+
+        if not sticker.thumbnail:
+            raise ValueError("Animated sticker has no thumbnail to moderate")
+        file = await bot.get_file(sticker.thumbnail.file_id)
+        return ModerationInputContent(type=ContentType.IMAGE_URL, image_urls=[file.file_path], extra=extra)
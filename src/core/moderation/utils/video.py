@@ -3,74 +3,344 @@ import tempfile
 import aiohttp
 import asyncio
 import os
-from typing import List
-from concurrent.futures import ThreadPoolExecutor
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+from src.core.tools.task_keeper import TaskKeeper
+from src.core.moderation.config import ModerationConfig
+
+
+def _init_decode_worker() -> None:
+    """解码进程初始化: 每个进程只用一个OpenCV线程, 避免多进程时CPU超额订阅"""
+    cv2.setNumThreads(1)
+
+
+def _decode_frames(video_path: str, sample_options: Dict[str, Any], frames, stopped) -> None:
+    """
+    在解码池中运行, 每解码一帧就把JPEG数据放进 frames 队列, 结束时放入None
+    stopped 被set时(调用方停止迭代)不再继续解码
+    """
+    try:
+        for frame in VideoProcessor.iter_frames(video_path, **sample_options):
+            if stopped.is_set():
+                break
+            frames.put(frame)
+    except Exception as e:
+        frames.put(e)
+    finally:
+        frames.put(None)
+
 
 class VideoProcessor:
     """视频处理工具"""
     
+    # 进程级共享的解码池, 以及限制同时解码视频数量的信号量
+    _executor: Optional[Executor] = None
+    # 进程模式下用于在进程间传递帧和停止信号
+    _manager = None
+    _decode_semaphore: Optional[asyncio.Semaphore] = None
+
+    # 下载分块大小, 从小块开始, 每次翻倍直到上限
+    MIN_CHUNK_SIZE = 64 * 1024
+    MAX_CHUNK_SIZE = 1024 * 1024
+
     @staticmethod
-    async def download_video(url: str) -> str:
-        """异步下载视频到临时文件"""
-        async with aiohttp.ClientSession() as session:
+    async def download_video(
+        url: str,
+        video_path: Optional[str] = None,
+        preview_ready: Optional[asyncio.Event] = None,
+        max_bytes: int = ModerationConfig.VIDEO_MAX_BYTES
+    ) -> str:
+        """
+        异步流式下载视频到临时文件
+        
+        Args:
+            url: 视频地址
+            video_path: 保存路径, 为空时创建临时文件
+            preview_ready: 下载到 VIDEO_PREVIEW_BYTES 字节(或下载完成)时set, 用于提前抽帧
+            max_bytes: 最大字节数, 超过时中止下载
+        """
+        timeout = aiohttp.ClientTimeout(total=ModerationConfig.VIDEO_DOWNLOAD_TIMEOUT)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
             async with session.get(url) as response:
                 if response.status != 200:
                     raise ValueError(f"Failed to download video: {response.status}")
+                if response.content_length and response.content_length > max_bytes:
+                    raise ValueError(f"Video too large: {response.content_length} bytes")
+                    
+                if video_path is None:
+                    temp = tempfile.NamedTemporaryFile(delete=False, suffix=".mp4")
+                    temp.close()
+                    video_path = temp.name
                     
-                temp = tempfile.NamedTemporaryFile(delete=False, suffix=".mp4")
-                async for chunk in response.content.iter_chunked(8192):
-                    temp.write(chunk)
-                temp.close()
-                return temp.name
+                downloaded = 0
+                chunk_size = VideoProcessor.MIN_CHUNK_SIZE
+                with open(video_path, "wb") as f:
+                    while True:
+                        chunk = await response.content.read(chunk_size)
+                        if not chunk:
+                            break
+                        downloaded += len(chunk)
+                        if downloaded > max_bytes:
+                            raise ValueError(f"Video too large: more than {max_bytes} bytes")
+                        f.write(chunk)
+                        chunk_size = min(chunk_size * 2, VideoProcessor.MAX_CHUNK_SIZE)
+                        
+                        if preview_ready and not preview_ready.is_set() and downloaded >= ModerationConfig.VIDEO_PREVIEW_BYTES:
+                            f.flush()
+                            preview_ready.set()
+                            
+                if preview_ready:
+                    preview_ready.set()
+                return video_path
+
+    @staticmethod
+    def encode_frame(frame, max_edge: int, quality: int) -> bytes:
+        """缩放帧到最长边不超过max_edge, 并在内存中编码为JPEG"""
+        height, width = frame.shape[:2]
+        if max_edge and max(height, width) > max_edge:
+            scale = max_edge / max(height, width)
+            frame = cv2.resize(
+                frame,
+                (max(1, int(width * scale)), max(1, int(height * scale))),
+                interpolation=cv2.INTER_AREA
+            )
+        ok, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            raise ValueError("Failed to encode frame")
+        return buffer.tobytes()
+
+    @staticmethod
+    def _iter_interval_frames(cap, frame_interval: int, max_frames: int) -> Iterator:
+        """顺序读取, 每 frame_interval 帧取一帧"""
+        frame_count = 0
+        sampled = 0
+        while sampled < max_frames:
+            # 跳过的帧只grab不解码成图像
+            if frame_count % frame_interval != 0:
+                if not cap.grab():
+                    break
+                frame_count += 1
+                continue
+                
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield frame
+            sampled += 1
+            frame_count += 1
+
+    @staticmethod
+    def _iter_timed_frames(cap, duration: float, count: int) -> Iterator:
+        """按时间戳跳转, 在整个视频时长内均匀取 count 帧"""
+        for i in range(count):
+            timestamp = duration * (i + 0.5) / count
+            cap.set(cv2.CAP_PROP_POS_MSEC, timestamp * 1000)
+            ret, frame = cap.read()
+            if ret:
+                yield frame
 
     @staticmethod
-    async def extract_frames(video_path: str, frame_interval: int = 30) -> List[str]:
-        """异步提取视频帧"""
-        def _extract_frames():
-            frames = []
-            temp_dir = tempfile.mkdtemp()
+    def _frame_histogram(frame):
+        """计算帧的HSV颜色直方图, 用于判断场景变化"""
+        small = cv2.resize(frame, (64, 64), interpolation=cv2.INTER_AREA)
+        hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+        hist = cv2.calcHist([hsv], [0, 1], None, [16, 16], [0, 180, 0, 256])
+        cv2.normalize(hist, hist)
+        return hist
+
+    @staticmethod
+    def _iter_scene_frames(frames: Iterator, threshold: float, max_frames: int) -> Iterator:
+        """只保留与上一张保留帧差异足够大的帧"""
+        last_hist = None
+        sampled = 0
+        for frame in frames:
+            if sampled >= max_frames:
+                break
+            hist = VideoProcessor._frame_histogram(frame)
+            if last_hist is not None and cv2.compareHist(last_hist, hist, cv2.HISTCMP_BHATTACHARYYA) < threshold:
+                continue
+            last_hist = hist
+            sampled += 1
+            yield frame
+
+    @staticmethod
+    def iter_frames(
+        video_path: str,
+        mode: str = ModerationConfig.VIDEO_SAMPLING_MODE,
+        frame_interval: int = ModerationConfig.VIDEO_FRAME_INTERVAL,
+        max_frames: int = ModerationConfig.VIDEO_MAX_FRAMES,
+        max_edge: int = ModerationConfig.VIDEO_FRAME_MAX_EDGE,
+        quality: int = ModerationConfig.VIDEO_FRAME_JPEG_QUALITY
+    ) -> Iterator[bytes]:
+        """
+        按抽帧模式解码视频, 产出JPEG数据(同步, 需在线程中运行)
+        
+        无论视频多长, 最多产出 max_frames 帧
+        """
+        cap = cv2.VideoCapture(video_path)
+        try:
+            if not cap.isOpened():
+                raise ValueError("Failed to open video")
+                
+            fps = cap.get(cv2.CAP_PROP_FPS) or 0
+            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+            duration = total_frames / fps if fps > 0 and total_frames > 0 else 0
             
+            if mode == "interval" or duration <= 0:
+                # 容器里没有时长信息时(部分gif/webm), 回退到顺序读取
+                frames = VideoProcessor._iter_interval_frames(cap, frame_interval, max_frames)
+            elif mode == "scene":
+                candidates = min(total_frames, max_frames * ModerationConfig.VIDEO_SCENE_CANDIDATE_FACTOR)
+                frames = VideoProcessor._iter_scene_frames(
+                    VideoProcessor._iter_timed_frames(cap, duration, candidates),
+                    ModerationConfig.VIDEO_SCENE_THRESHOLD,
+                    max_frames
+                )
+            else:
+                frames = VideoProcessor._iter_timed_frames(cap, duration, min(total_frames, max_frames))
+                
+            for frame in frames:
+                yield VideoProcessor.encode_frame(frame, max_edge, quality)
+        finally:
+            cap.release()
+
+    @classmethod
+    def _get_executor(cls) -> Executor:
+        """获取共享的解码池, 第一次调用时创建"""
+        if cls._executor is None:
+            if ModerationConfig.VIDEO_DECODE_USE_PROCESSES:
+                cls._executor = ProcessPoolExecutor(
+                    max_workers=ModerationConfig.VIDEO_DECODE_WORKERS,
+                    initializer=_init_decode_worker
+                )
+            else:
+                cls._executor = ThreadPoolExecutor(
+                    max_workers=ModerationConfig.VIDEO_DECODE_WORKERS,
+                    thread_name_prefix="video-decode"
+                )
+        return cls._executor
+
+    @classmethod
+    def _create_channel(cls):
+        """创建传递帧的队列和停止信号, 进程池需要通过Manager跨进程共享"""
+        if isinstance(cls._get_executor(), ProcessPoolExecutor):
+            if cls._manager is None:
+                cls._manager = multiprocessing.Manager()
+            return cls._manager.Queue(), cls._manager.Event()
+        return queue.Queue(), threading.Event()
+
+    @classmethod
+    def _discard_executor(cls) -> None:
+        """丢弃解码池, 下次使用时重建"""
+        executor = cls._executor
+        cls._executor = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @classmethod
+    def shutdown_executor(cls) -> None:
+        """关闭解码池(退出时调用)"""
+        cls._discard_executor()
+        manager = cls._manager
+        cls._manager = None
+        if manager is not None:
+            manager.shutdown()
+
+    @classmethod
+    async def extract_frames(cls, video_path: str, **sample_options: Any) -> AsyncIterator[bytes]:
+        """
+        异步提取视频帧, 在共享解码池中解码, 解码一帧就产出一帧, 不落盘
+        sample_options 会传给 iter_frames, 用于覆盖抽帧模式和帧数
+        调用方提前停止迭代时通知解码任务退出
+        """
+        if cls._decode_semaphore is None:
+            cls._decode_semaphore = asyncio.Semaphore(ModerationConfig.VIDEO_DECODE_CONCURRENCY)
+            
+        loop = asyncio.get_running_loop()
+        async with cls._decode_semaphore:
+            frames, stopped = cls._create_channel()
+            decode = loop.run_in_executor(
+                cls._get_executor(), _decode_frames, video_path, sample_options, frames, stopped
+            )
             try:
-                cap = cv2.VideoCapture(video_path)
-                if not cap.isOpened():
-                    raise ValueError("Failed to open video")
-                    
-                frame_count = 0
                 while True:
-                    ret, frame = cap.read()
-                    if not ret:
+                    getter = loop.run_in_executor(None, frames.get)
+                    await asyncio.wait({getter, decode}, return_when=asyncio.FIRST_COMPLETED)
+                    if not getter.done() and decode.exception() is not None:
+                        # 解码进程崩溃时不会放入结束标记, 由这里放入以唤醒读取线程
+                        frames.put(None)
+                        await getter
+                        await decode
+                    item = await getter
+                    if item is None:
                         break
-                        
-                    if frame_count % frame_interval == 0:
-                        frame_path = os.path.join(temp_dir, f"frame_{frame_count}.jpg")
-                        cv2.imwrite(frame_path, frame)
-                        frames.append(frame_path)
-                        
-                    frame_count += 1
-                    
+                    if isinstance(item, Exception):
+                        raise item
+                    yield item
+                await decode
+            except BrokenProcessPool:
+                # 解码进程崩溃(例如损坏的视频)会让整个进程池不可用, 丢弃后下次重建
+                cls._discard_executor()
+                raise ValueError("Video decode worker crashed")
             finally:
-                if 'cap' in locals():
-                    cap.release()
-                    
-            return frames
-
-        # 使用 ThreadPoolExecutor 执行 CPU 密集型操作
-        loop = asyncio.get_running_loop()
-        with ThreadPoolExecutor() as pool:
-            return await loop.run_in_executor(pool, _extract_frames)
-
+                # 等待解码任务退出(最多再解码一帧), 使信号量仍能限制同时解码的数量
+                stopped.set()
+                if not decode.done():
+                    try:
+                        await decode
+                    except Exception:
+                        pass
+                
     @staticmethod
-    async def process_video(url: str) -> List[str]:
-        """处理视频并返回帧图片路径列表"""
-        video_path = None
+    async def process_video(url: str) -> AsyncIterator[bytes]:
+        """
+        处理视频, 逐个产出帧的JPEG数据
+        
+        下载到一定大小时先从部分文件中取开头的几帧产出, 调用方可以据此提前判定违规并停止迭代,
+        停止迭代时会取消还未完成的下载
+        """
+        temp = tempfile.NamedTemporaryFile(delete=False, suffix=".mp4")
+        temp.close()
+        video_path = temp.name
+        
+        preview_ready = asyncio.Event()
+        download = TaskKeeper.create_task(
+            VideoProcessor.download_video(url, video_path, preview_ready)
+        )
         try:
-            # 下载视频
-            video_path = await VideoProcessor.download_video(url)
+            # 等待预审所需的数据, 或者下载结束
+            waiter = TaskKeeper.create_task(preview_ready.wait())
+            await asyncio.wait({download, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            waiter.cancel()
+            
+            if not download.done():
+                try:
+                    async for frame in VideoProcessor.extract_frames(
+                        video_path,
+                        mode="interval",
+                        max_frames=ModerationConfig.VIDEO_PREVIEW_FRAMES
+                    ):
+                        yield frame
+                except Exception as e:
+                    # 部分文件可能无法解码(例如moov在文件末尾), 等待完整下载
+                    print(f"[INFO] 视频预审抽帧失败, 等待下载完成: {str(e)}")
+                    
+            # 下载失败时在这里抛出异常
+            await download
+            
             # 提取帧
-            return await VideoProcessor.extract_frames(video_path)
+            async for frame in VideoProcessor.extract_frames(video_path):
+                yield frame
         finally:
+            # 调用方提前停止时取消下载
+            if not download.done():
+                download.cancel()
             # 清理视频临时文件
-            if video_path and os.path.exists(video_path):
+            if os.path.exists(video_path):
                 try:
                     os.unlink(video_path)
                 except Exception:
@@ -1,40 +1,57 @@
 from telegram import Update
 from telegram.ext import ContextTypes
-import re
 from typing import Callable
+from src.core.registry.callback_router import CallbackRouter
 from src.core.registry.registry_base import Registry_Base
 from src.core.tools.task_keeper import TaskKeeper
 
 # 回调注册器
 class CallbackRegistry:
     _instance = None
-    _handlers = []
+    _router = CallbackRouter()
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
 
+    @staticmethod
+    def _bind(func: Callable) -> Callable:
+        """包装处理器, 调用时从Registry获取所属类的实例"""
+        async def wrapper(*args, **kwargs):
+            # 获取函数所属的类名
+            if hasattr(func, '__qualname__'):
+                class_name = func.__qualname__.split('.')[0]
+                # 从Registry获取实例
+                instance = Registry_Base.get_handler(class_name)
+                if instance:
+                    bound_method = getattr(instance, func.__name__)
+                    return await bound_method(*args, **kwargs)
+            return await func(*args, **kwargs)
+        return wrapper
+
     @classmethod
     def register(cls, pattern: str):
-        """装饰器，用于注册回调处理器"""
-        regex = re.compile(pattern)
-        
+        """装饰器，用于注册回调处理器(正则)"""
         def decorator(func: Callable):
             print(f"[Register] {func.__qualname__} -> {pattern}")
-            
-            async def wrapper(*args, **kwargs):
-                # 获取函数所属的类名
-                if hasattr(func, '__qualname__'):
-                    class_name = func.__qualname__.split('.')[0]
-                    # 从Registry获取实例
-                    instance = Registry_Base.get_handler(class_name)
-                    if instance:
-                        bound_method = getattr(instance, func.__name__)
-                        return await bound_method(*args, **kwargs)
-                return await func(*args, **kwargs)
-            
-            cls._handlers.append((regex, wrapper))
+            cls._router.add_regex(pattern, cls._bind(func))
+            return func
+        return decorator
+
+    @classmethod
+    def route(cls, *paths: str):
+        """
+        装饰器，按 ":" 分段注册回调处理器, 路径中的参数转换类型后作为关键字参数传给处理器
+
+        例: @CallbackRegistry.route("admin:rg:{rule_group_id}:groups:list:{page:int}")
+        rule_group_id / page / chat_id 等常用参数名会自动推断类型; 一个处理器可以注册多条路径
+        """
+        def decorator(func: Callable):
+            wrapper = cls._bind(func)
+            for path in paths:
+                print(f"[Register] {func.__qualname__} -> {path}")
+                cls._router.add_route(path, wrapper)
             return func
         return decorator
 
@@ -45,12 +62,14 @@ class CallbackRegistry:
             
         query = update.callback_query
         data = query.data
-        
-        for pattern, handler in self._handlers:
-            if pattern.match(data):
-                try:
-                    TaskKeeper.create_task(handler(update, context))
-                finally:
-                    await query.answer()
-                return
-        print(f"[Callback] {data} not found")
\ No newline at end of file
+
+        matched = self._router.match(data)
+        if matched is None:
+            print(f"[Callback] {data} not found")
+            return
+
+        handler, params = matched
+        try:
+            TaskKeeper.create_task(handler(update, context, **params))
+        finally:
+            await query.answer()
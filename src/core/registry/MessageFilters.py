@@ -19,17 +19,22 @@ class MessageFilters:
             if prefix in MessageFilters.COMMANDS:
                 print(f"[DEV][ERROR] 前缀 {prefix} 已存在!!!请勿重复注册")
         
+        # 注册时编译一次
+        regex = re.compile(f"^/?({'|'.join(prefixes)})", re.IGNORECASE)
+        
         def filter(update: Update) -> bool:
             if not update.message or (not update.message.text and not update.message.caption):
                 return False
             text = update.message.text or update.message.caption
-            pattern = f"^/?({'|'.join(prefixes)})"
-            match = re.match(pattern, text, re.IGNORECASE)
+            match = regex.match(text)
             if match:
                 return True
             return False
         
         MessageFilters.COMMANDS.extend(prefixes)
+        # 供 MessageRegistry 建立分发索引
+        filter.index_kind = "prefix"
+        filter.index_keys = list(prefixes)
         return filter
 
     @staticmethod
@@ -50,6 +55,7 @@ class MessageFilters:
                 return True
             return False
         
+        filter.index_kind = "text"
         return filter
     
     @staticmethod
@@ -59,6 +65,8 @@ class MessageFilters:
         pattern: 要匹配被回复消息的正则表达式
         
         """
+        regex = re.compile(pattern, re.IGNORECASE)
+        
         def filter(update: Update) -> bool:
             if not update.message or not update.message.reply_to_message:
                 return False
@@ -74,8 +82,9 @@ class MessageFilters:
                 return False
                 
             # 匹配正则
-            return bool(re.search(pattern, reply_text, re.IGNORECASE))
+            return bool(regex.search(reply_text))
             
+        filter.index_kind = "reply"
         return filter
         
 
@@ -92,6 +101,22 @@ class MessageFilters:
                 if hasattr(update.message, media_type) and getattr(update.message, media_type):
                     return True
             return False
+        filter.index_kind = "media"
+        filter.index_keys = list(media_types)
+        return filter
+
+    @staticmethod
+    def match_group_text():
+        """
+        匹配群组中的普通文本消息(不含命令)
+        兜底过滤器: 只在其它处理器都不匹配时才检查, 不会抢走命令和回复处理器的消息
+        """
+        def filter(update: Update) -> bool:
+            message = update.message
+            if not message or not message.text or message.text.startswith("/"):
+                return False
+            return message.chat.type in ("group", "supergroup")
+        filter.index_kind = "fallback"
         return filter
 
     @staticmethod
@@ -102,4 +127,5 @@ class MessageFilters:
                 return False
             return any(member.id == update.get_bot().id 
                       for member in update.message.new_chat_members)
+        filter.index_kind = "bot_added"
         return filter
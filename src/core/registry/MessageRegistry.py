@@ -3,13 +3,32 @@ from telegram.ext import ContextTypes
 # from telegram.ext import ApplicationHandlerStop
 from typing import List, Callable, Tuple
 from src.core.registry.registry_base import Registry_Base  # 导入基础注册器
-import traceback
 import asyncio
 from src.core.database.InfoSaver import InfoSaver
 from src.core.tools.task_keeper import TaskKeeper
+from src.core.tools.work_queue import PriorityWorkQueue
+from src.core.registry.dispatch_index import MessageDispatchIndex
+from src.core.moderation.config import ModerationConfig
+
+# 消息处理优先级, 数值越小越先处理: 文本 < 图片 < 视频
+PRIORITY_TEXT = 0
+PRIORITY_IMAGE = 1
+PRIORITY_VIDEO = 2
+
 class MessageRegistry:
     _instance = None
     _handlers: List[Tuple[Callable, Callable]] = []  # [(filter_func, handler_func), ...]
+    # 注册时建立的分发索引, 分发耗时不随处理器数量增长
+    _index = MessageDispatchIndex()
+    # 有界并发的处理队列, 按群组公平调度
+    _queue = PriorityWorkQueue(
+        "MessageRegistry",
+        workers=ModerationConfig.MODERATION_WORKERS,
+        priorities=3,
+        max_pending=ModerationConfig.MODERATION_MAX_PENDING,
+        max_pending_per_key=ModerationConfig.MODERATION_MAX_PENDING_PER_CHAT,
+        max_lanes=ModerationConfig.MODERATION_MAX_LANES,
+    )
 
     def __new__(cls):
         if cls._instance is None:
@@ -65,18 +84,71 @@ class MessageRegistry:
                 return await func(update, context)
             
             cls._handlers.append((message_filter, wrapper))
+            cls._index.add(message_filter, wrapper)
             return func
         return decorator
 
+    @staticmethod
+    def _get_priority(update: Update) -> int:
+        """根据消息类型确定处理优先级, 处理成本越低越优先"""
+        message = update.message
+        if not message:
+            return PRIORITY_TEXT
+        if message.video or message.animation or message.video_note:
+            return PRIORITY_VIDEO
+        if message.photo or message.sticker:
+            return PRIORITY_IMAGE
+        return PRIORITY_TEXT
+
+    @staticmethod
+    def lane_key(chat_id, user_id=None):
+        """
+        消息所属的执行通道, 同一通道的消息按到达顺序逐个处理, 避免并发修改同一群组/用户的状态(例如警告次数)
+
+        MODERATION_LANE_MODE: user 按群组+用户(默认), chat 按群组, off 不限制
+        """
+        mode = ModerationConfig.MODERATION_LANE_MODE
+        if mode == "off" or chat_id is None:
+            return None
+        if mode == "chat":
+            return chat_id
+        return (chat_id, user_id)
+
+    @classmethod
+    async def submit(cls, key, job: Callable, priority: int = PRIORITY_TEXT, lane=None) -> None:
+        """
+        向处理队列提交额外的任务, 例如相册收集完成后的审核, 队列已满时等待空位
+        
+        :param key: 公平调度的分组键, 一般是chat_id
+        :param job: 返回协程的函数
+        :param lane: 执行通道, 见 lane_key
+        """
+        await cls._queue.submit(key, job, priority, lane)
+
+    @classmethod
+    def get_queue_stats(cls) -> dict:
+        """获取处理队列的监控指标"""
+        return cls._queue.get_stats()
+
+    @classmethod
+    async def stop_queue(cls) -> None:
+        """停止处理队列"""
+        await cls._queue.stop()
+
     @classmethod
     async def dispatch(cls, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """分发消息到对应的处理器"""
         TaskKeeper.create_task(InfoSaver.info_save(update, context))
-        for filter_func, handler in cls._handlers:
-            try:
-                if filter_func and filter_func(update):
-                    TaskKeeper.create_task(handler(update, context))
-                    return
-            except Exception as e:
-                print(f"Error in message handler: {e}, {traceback.format_exc()}")
-        print("[DEV] No handler found for update:", update)
+        handler = cls._index.match(update)
+        if handler is None:
+            print("[DEV] No handler found for update:", update)
+            return
+        chat_id = update.effective_chat.id if update.effective_chat else None
+        user_id = update.effective_user.id if update.effective_user else None
+        # 队列已满时在这里等待, 更新的接收随之变慢, 不丢弃消息
+        await cls._queue.submit(
+            chat_id,
+            lambda: handler(update, context),
+            cls._get_priority(update),
+            cls.lane_key(chat_id, user_id),
+        )
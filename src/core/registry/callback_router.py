@@ -0,0 +1,207 @@
+import re
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Pattern, Tuple
+
+
+class ParamType(NamedTuple):
+    """路由参数类型: 匹配一个段的正则和类型转换函数"""
+    pattern: Pattern
+    convert: Callable[[str], Any]
+
+
+PARAM_TYPES: Dict[str, ParamType] = {
+    "str": ParamType(re.compile(r"[^:]+"), str),
+    "path": ParamType(re.compile(r".+"), str),  # 剩余的所有内容, 可以包含 ":", 只能放在最后
+    "int": ParamType(re.compile(r"-?\d+"), int),
+    "rgid": ParamType(re.compile(r".{16}"), str),  # 规则组ID, 固定16位
+}
+
+# 未指定类型时按参数名推断
+DEFAULT_PARAM_TYPES = {
+    "rule_group_id": "rgid",
+    "page": "int",
+    "chat_id": "int",
+    "user_id": "int",
+    "log_id": "int",
+}
+
+
+class _Segment(NamedTuple):
+    """非字面量的段"""
+    pattern: Pattern
+    name: Optional[str]  # 参数名, 为空时不传给处理器
+    convert: Callable[[str], Any]
+    rest: bool  # 匹配剩余的所有内容
+
+
+class _Route(NamedTuple):
+    order: int
+    handler: Callable
+
+
+class _Node:
+    __slots__ = ("literals", "segments", "routes")
+
+    def __init__(self):
+        self.literals: Dict[str, "_Node"] = {}
+        self.segments: List[Tuple[_Segment, "_Node"]] = []
+        self.routes: List[_Route] = []
+
+
+class CallbackRouter:
+    """
+    按 ":" 分段的回调数据路由(前缀树)
+
+    - route("admin:rg:{rule_group_id}:groups:list:{page:int}") 注册带类型参数的路由, 参数会转换类型后传给处理器
+    - 已有的正则会尽量转换为树上的路径(字面量段直接查字典), 无法转换的正则按顺序逐个匹配
+    多个路由都匹配时取最先注册的, 与按注册顺序逐个匹配正则的结果一致
+    """
+
+    _PARAM = re.compile(r"^\{(\w+)(?::([\w|]+))?\}$")
+    # 按 ":" 分段, 参数 {name:type} 中的 ":" 除外
+    _SPLIT = re.compile(r":(?![^{]*\})")
+    _LITERAL = re.compile(r"^[\w\-]+$")
+    # 可选的段: (:menu)? 或 (?::(\d+))?
+    _OPTIONAL = re.compile(r"\((?:\?:)?(:(?:[\w\-]+|\([^()]*\)))\)\?")
+
+    def __init__(self):
+        self._root = _Node()
+        self._count = 0
+        self._fallback: List[Tuple[int, Pattern, Callable]] = []
+
+    def _insert(self, segments: List[Any], route: _Route) -> None:
+        node = self._root
+        for segment in segments:
+            if isinstance(segment, str):
+                node = node.literals.setdefault(segment, _Node())
+                continue
+            for existing, child in node.segments:
+                if existing == segment:
+                    node = child
+                    break
+            else:
+                child = _Node()
+                node.segments.append((segment, child))
+                node = child
+        node.routes.append(route)
+
+    def add_route(self, path: str, handler: Callable) -> None:
+        """注册路由, 参数写作 {name}、{name:type} 或 {name:a|b|c}"""
+        route = _Route(self._count, handler)
+        self._count += 1
+
+        segments = []
+        for part in self._SPLIT.split(path):
+            match = self._PARAM.match(part)
+            if not match:
+                segments.append(part)
+                continue
+            name, type_name = match.groups()
+            if type_name and "|" in type_name:
+                # {action:approve|reject}: 只匹配列出的值
+                param_type = ParamType(re.compile(type_name), str)
+            else:
+                param_type = PARAM_TYPES[type_name or DEFAULT_PARAM_TYPES.get(name, "str")]
+            segments.append(_Segment(param_type.pattern, name, param_type.convert, param_type is PARAM_TYPES["path"]))
+        self._insert(segments, route)
+
+    def _expand(self, pattern: str) -> List[str]:
+        """展开可选的段, 每个可选段产生 有/无 两种路径"""
+        match = self._OPTIONAL.search(pattern)
+        if not match:
+            return [pattern]
+        without = pattern[:match.start()] + pattern[match.end():]
+        with_ = pattern[:match.start()] + match.group(1) + pattern[match.end():]
+        return self._expand(with_) + self._expand(without)
+
+    def _translate(self, pattern: str) -> Optional[List[List[Any]]]:
+        """把正则转换为若干条分段路径, 无法转换时返回None"""
+        if not pattern.startswith("^") or not pattern.endswith("$"):
+            return None
+
+        paths = []
+        for expanded in self._expand(pattern[1:-1]):
+            # 顶层的选择分支会跨段, 交给正则
+            depth = 0
+            for char in expanded:
+                depth += {"(": 1, ")": -1}.get(char, 0)
+                if char == "|" and depth == 0:
+                    return None
+            parts = expanded.split(":")
+            segments = []
+            for i, part in enumerate(parts):
+                if self._LITERAL.match(part):
+                    segments.append(part)
+                    continue
+                if "(?" in part or part.count("(") != part.count(")"):
+                    return None
+                try:
+                    segment_pattern = re.compile(part)
+                except re.error:
+                    return None
+                rest = i == len(parts) - 1 and part in (".*", ".+", "(.*)", "(.+)")
+                segments.append(_Segment(segment_pattern, None, str, rest))
+            paths.append(segments)
+        return paths
+
+    def add_regex(self, pattern: str, handler: Callable) -> None:
+        """注册正则路由, 能转换的放进前缀树, 否则作为兜底逐个匹配"""
+        route = _Route(self._count, handler)
+        self._count += 1
+
+        paths = self._translate(pattern)
+        if paths is None:
+            self._fallback.append((route.order, re.compile(pattern), handler))
+            return
+        for segments in paths:
+            self._insert(segments, route)
+
+    def _search(
+        self,
+        node: _Node,
+        parts: List[str],
+        index: int,
+        params: Dict[str, Any],
+        best: Optional[Tuple[_Route, Dict[str, Any]]]
+    ) -> Optional[Tuple[_Route, Dict[str, Any]]]:
+        if index == len(parts):
+            for route in node.routes:
+                if best is None or route.order < best[0].order:
+                    best = (route, dict(params))
+            return best
+
+        child = node.literals.get(parts[index])
+        if child is not None:
+            best = self._search(child, parts, index + 1, params, best)
+
+        for segment, child in node.segments:
+            if segment.rest:
+                value = ":".join(parts[index:])
+                if segment.pattern.fullmatch(value):
+                    if segment.name:
+                        params[segment.name] = segment.convert(value)
+                    best = self._search(child, parts, len(parts), params, best)
+                    params.pop(segment.name, None)
+                continue
+            value = parts[index]
+            if not segment.pattern.fullmatch(value):
+                continue
+            if segment.name:
+                try:
+                    params[segment.name] = segment.convert(value)
+                except ValueError:
+                    continue
+            best = self._search(child, parts, index + 1, params, best)
+            params.pop(segment.name, None)
+        return best
+
+    def match(self, data: str) -> Optional[Tuple[Callable, Dict[str, Any]]]:
+        """返回 (处理器, 参数), 没有匹配时返回None"""
+        best = self._search(self._root, data.split(":"), 0, {}, None)
+        for order, pattern, handler in self._fallback:
+            if best is not None and order > best[0].order:
+                break
+            if pattern.match(data):
+                return handler, {}
+        if best is None:
+            return None
+        return best[0].handler, best[1]
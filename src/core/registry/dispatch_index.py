@@ -0,0 +1,107 @@
+import re
+import traceback
+from typing import Callable, Dict, List, NamedTuple, Optional, Pattern
+from telegram import Update
+
+
+class _Entry(NamedTuple):
+    order: int  # 注册顺序, 多个处理器都匹配时取最先注册的
+    filter: Callable
+    handler: Callable
+
+
+class MessageDispatchIndex:
+    """
+    消息处理器的分发索引
+
+    注册时根据过滤器的 index_kind 把处理器放进不同的索引:
+    - media: 按媒体类型建字典, 直接查表
+    - prefix: 所有命令前缀合并成一个正则, 一次匹配
+    - text / reply / bot_added: 只在消息带文本 / 是回复 / 有新成员时才检查
+    - 其它自定义过滤器: 最后逐个检查
+    - fallback: 兜底处理器, 只在其它处理器都不匹配时才检查
+    除兜底处理器外, 分发结果与按注册顺序逐个检查过滤器完全一致
+    """
+
+    # 需要消息满足前置条件才检查的索引
+    GUARDS = {
+        "text": lambda message: message.text or message.caption,
+        "reply": lambda message: message.reply_to_message,
+        "bot_added": lambda message: message.new_chat_members,
+    }
+
+    def __init__(self):
+        self._count = 0
+        self._media: Dict[str, List[_Entry]] = {}
+        self._prefixes: List[str] = []
+        self._prefix_entries: Dict[str, _Entry] = {}
+        self._prefix_regex: Optional[Pattern] = None
+        self._guarded: Dict[str, List[_Entry]] = {kind: [] for kind in self.GUARDS}
+        self._custom: List[_Entry] = []
+        self._fallback: List[_Entry] = []
+
+    def add(self, message_filter: Callable, handler: Callable) -> None:
+        """注册处理器"""
+        entry = _Entry(self._count, message_filter, handler)
+        self._count += 1
+        # 没有过滤器的处理器永远不会匹配
+        if message_filter is None:
+            return
+
+        kind = getattr(message_filter, "index_kind", None)
+        if kind == "media":
+            for media_type in message_filter.index_keys:
+                self._media.setdefault(media_type, []).append(entry)
+        elif kind == "prefix":
+            group = f"h{entry.order}"
+            self._prefixes.append(f"(?P<{group}>{'|'.join(message_filter.index_keys)})")
+            self._prefix_entries[group] = entry
+            # 按注册顺序排列分支, 正则会选中最先注册的那个
+            self._prefix_regex = re.compile(f"^/?(?:{'|'.join(self._prefixes)})", re.IGNORECASE)
+        elif kind == "fallback":
+            self._fallback.append(entry)
+        elif kind in self.GUARDS:
+            self._guarded[kind].append(entry)
+        else:
+            self._custom.append(entry)
+
+    @staticmethod
+    def _first_match(entries: List[_Entry], update: Update, best: Optional[_Entry]) -> Optional[_Entry]:
+        """按注册顺序检查过滤器, 比当前结果注册得晚的不再检查"""
+        for entry in entries:
+            if best is not None and entry.order > best.order:
+                break
+            try:
+                if entry.filter(update):
+                    return entry
+            except Exception as e:
+                print(f"Error in message handler: {e}, {traceback.format_exc()}")
+        return best
+
+    def match(self, update: Update) -> Optional[Callable]:
+        """返回第一个匹配的处理器"""
+        best: Optional[_Entry] = None
+        message = update.message
+
+        if message:
+            # 媒体类型: 同一类型的过滤器必然匹配, 直接取最先注册的
+            for media_type, entries in self._media.items():
+                if getattr(message, media_type, None) and (best is None or entries[0].order < best.order):
+                    best = entries[0]
+
+            text = message.text or message.caption
+            if text and self._prefix_regex is not None:
+                match = self._prefix_regex.match(text)
+                if match:
+                    entry = self._prefix_entries[match.lastgroup]
+                    if best is None or entry.order < best.order:
+                        best = entry
+
+            for kind, guard in self.GUARDS.items():
+                if self._guarded[kind] and guard(message):
+                    best = self._first_match(self._guarded[kind], update, best)
+
+        best = self._first_match(self._custom, update, best)
+        if best is None:
+            best = self._first_match(self._fallback, update, None)
+        return best.handler if best else None
@@ -0,0 +1,169 @@
+import asyncio
+import bisect
+import hashlib
+import multiprocessing
+from queue import Empty
+import traceback
+from typing import Any, Callable, Dict, Hashable, List, Optional
+from telegram import Update
+from telegram.ext import Application, ContextTypes
+
+# 队列中的消息类型
+MESSAGE_UPDATE = "update"
+MESSAGE_INVALIDATE_CONFIG = "invalidate_config"
+
+
+class ConsistentHashRing:
+    """
+    一致性哈希环
+
+    每个节点放置 replicas 个虚拟节点, 节点数量变化时只有少部分key换到别的节点;
+    使用md5而不是hash(), 保证不同进程、不同次启动的结果一致
+    """
+
+    def __init__(self, nodes: List[Hashable], replicas: int = 100):
+        self._ring: List[int] = []
+        self._nodes: Dict[int, Hashable] = {}
+        for node in nodes:
+            for i in range(replicas):
+                point = self._hash(f"{node}#{i}")
+                self._nodes[point] = node
+                bisect.insort(self._ring, point)
+
+    @staticmethod
+    def _hash(key: Any) -> int:
+        return int.from_bytes(hashlib.md5(str(key).encode()).digest()[:8], "big")
+
+    def get(self, key: Any) -> Hashable:
+        """返回key所属的节点"""
+        index = bisect.bisect(self._ring, self._hash(key)) % len(self._ring)
+        return self._nodes[self._ring[index]]
+
+
+class ShardRouter:
+    """
+    多进程模式的入口: 接收更新后按chat_id一致性哈希转发给worker进程
+
+    同一个群组的更新始终由同一个worker处理, 群组相关的进程内状态(队列、相册、缓存等)都留在该worker上;
+    worker意外退出时在下一次转发前重新启动
+    """
+
+    def __init__(self, workers: int, target: Callable[[int, List[Any]], None]):
+        """
+        :param workers: worker进程数量
+        :param target: worker进程的入口函数 target(index, queues), 需要可以被pickle(模块级函数)
+        """
+        self._context = multiprocessing.get_context("spawn")
+        self._target = target
+        self._queues = [self._context.Queue() for _ in range(workers)]
+        self._processes: List[Optional[multiprocessing.Process]] = [None] * workers
+        self._ring = ConsistentHashRing(list(range(workers)))
+
+        # 监控指标
+        self._forwarded = [0] * workers
+        self._restarts = 0
+
+    def _start_worker(self, index: int) -> None:
+        # 不能使用daemon进程: daemon进程不能创建子进程, worker需要视频解码进程池;
+        # 退出时由 stop 负责通知、等待并结束worker, 入口进程意外退出时worker自行退出
+        process = self._context.Process(
+            target=self._target,
+            args=(index, self._queues),
+            name=f"moderation-worker-{index}",
+        )
+        process.start()
+        self._processes[index] = process
+        print(f"[INFO] worker {index} 已启动, pid={process.pid}")
+
+    def start(self) -> None:
+        for index in range(len(self._queues)):
+            self._start_worker(index)
+
+    @staticmethod
+    def shard_key(update: Update) -> Optional[int]:
+        """分片键: 优先chat_id, 没有群组的更新(例如inline查询)使用user_id"""
+        if update.effective_chat:
+            return update.effective_chat.id
+        if update.effective_user:
+            return update.effective_user.id
+        return None
+
+    async def forward(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """转发更新到对应的worker"""
+        key = self.shard_key(update)
+        index = self._ring.get(key) if key is not None else 0
+
+        process = self._processes[index]
+        if process is None or not process.is_alive():
+            self._restarts += 1
+            print(f"[WARNING] worker {index} 已退出, 重新启动")
+            self._start_worker(index)
+
+        self._queues[index].put((MESSAGE_UPDATE, update.to_dict()))
+        self._forwarded[index] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取监控指标"""
+        return {
+            "workers": len(self._queues),
+            "alive": sum(1 for process in self._processes if process and process.is_alive()),
+            "forwarded": list(self._forwarded),
+            "restarts": self._restarts,
+        }
+
+    def stop(self, timeout: float = 10) -> None:
+        """通知所有worker退出并等待"""
+        for queue in self._queues:
+            queue.put(None)
+        for process in self._processes:
+            if process is None:
+                continue
+            process.join(timeout)
+            if process.is_alive():
+                print(f"[WARNING] worker {process.name} 未在 {timeout} 秒内退出, 强制结束")
+                process.terminate()
+                process.join()
+        self._processes = [None] * len(self._queues)
+
+
+class ShardWorker:
+    """worker进程一侧: 从队列读取更新, 放进本进程 application 的更新队列"""
+
+    def __init__(self, index: int, queues: List[Any]):
+        self.index = index
+        self.queues = queues
+        self.queue = queues[index]
+
+    def broadcast_config_change(self, rule_group_id: str) -> None:
+        """规则组配置被修改, 通知其它worker清除该规则组的配置缓存"""
+        for index, queue in enumerate(self.queues):
+            if index != self.index:
+                queue.put((MESSAGE_INVALIDATE_CONFIG, rule_group_id))
+
+    def _get(self) -> Any:
+        """阻塞读取队列, 入口进程已退出时返回None"""
+        parent = multiprocessing.parent_process()
+        while True:
+            try:
+                return self.queue.get(timeout=1)
+            except Empty:
+                if parent is not None and not parent.is_alive():
+                    print(f"[WARNING] worker {self.index} 的入口进程已退出")
+                    return None
+
+    async def consume(self, application: Application, on_invalidate: Callable[[str], None]) -> None:
+        """读取队列直到收到退出信号(None)"""
+        while True:
+            message = await asyncio.to_thread(self._get)
+            if message is None:
+                print(f"[INFO] worker {self.index} 收到退出信号")
+                return
+
+            kind, payload = message
+            try:
+                if kind == MESSAGE_UPDATE:
+                    await application.update_queue.put(Update.de_json(payload, application.bot))
+                elif kind == MESSAGE_INVALIDATE_CONFIG:
+                    on_invalidate(payload)
+            except Exception as e:
+                print(f"[ERROR] worker {self.index} 处理消息失败: {e}, {traceback.format_exc()}")
@@ -0,0 +1,134 @@
+import hmac
+import json
+import secrets
+import traceback
+from typing import Any, Callable, Dict, Optional
+from aiohttp import web
+from telegram import Update
+from telegram.ext import Application
+
+
+class WebhookServer:
+    """
+    Webhook模式: 内置aiohttp服务器接收Telegram推送的更新
+
+    - 校验 X-Telegram-Bot-Api-Secret-Token, 不匹配的请求直接返回403
+    - 更新放进 application.update_queue, 与轮询模式走同一套 MessageRegistry / CallbackRegistry 分发
+    - 收到更新后立即返回200, 处理在后台进行, Telegram不会因为处理慢而重发
+    - 多个副本可以放在同一个URL的负载均衡后面, 各副本需要使用相同的 secret_token
+    - /healthz 只返回存活状态; /stats 返回监控指标, 同样需要 secret_token
+    """
+
+    SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+    def __init__(
+        self,
+        application: Application,
+        url: str,
+        path: str = "/webhook",
+        host: str = "0.0.0.0",
+        port: int = 8443,
+        secret_token: Optional[str] = None,
+        max_connections: int = 40,
+        stats: Optional[Callable[[], Dict[str, Any]]] = None,
+    ):
+        """
+        :param url: Telegram推送的公网地址(不含path), 例如 https://bot.example.com
+        :param path: 接收更新的路径
+        :param secret_token: 校验用的密钥, 未设置时随机生成(多副本部署时必须设置)
+        :param max_connections: Telegram同时推送的最大连接数(1-100)
+        :param stats: /stats 附带的监控指标
+        """
+        self.application = application
+        self.url = url.rstrip("/")
+        self.path = "/" + path.strip("/")
+        self.host = host
+        self.port = port
+        self.max_connections = min(max(max_connections, 1), 100)
+        self.stats = stats
+        if not secret_token:
+            secret_token = secrets.token_urlsafe(32)
+            print("[WARNING] 未设置 WEBHOOK_SECRET, 使用随机生成的密钥, 多副本部署时需要设置为相同的值")
+        self.secret_token = secret_token
+        self._runner: Optional[web.AppRunner] = None
+
+        # 监控指标
+        self._received = 0
+        self._rejected = 0
+
+    def build_app(self) -> web.Application:
+        """创建aiohttp应用"""
+        app = web.Application()
+        app.router.add_post(self.path, self._handle_update)
+        app.router.add_get("/healthz", self._handle_health)
+        app.router.add_get("/stats", self._handle_stats)
+        return app
+
+    async def process_update(self, data: Dict[str, Any]) -> None:
+        """把一条更新交给分发流程"""
+        update = Update.de_json(data, self.application.bot)
+        await self.application.update_queue.put(update)
+        self._received += 1
+
+    def _authorized(self, request: web.Request) -> bool:
+        """校验请求头中的 secret_token"""
+        # 按字节比较, 请求头中有非ASCII字符时 compare_digest 对str会抛出TypeError
+        token = request.headers.get(self.SECRET_HEADER, "")
+        if hmac.compare_digest(token.encode(), self.secret_token.encode()):
+            return True
+        self._rejected += 1
+        return False
+
+    async def _handle_update(self, request: web.Request) -> web.Response:
+        if not self._authorized(request):
+            return web.Response(status=403)
+
+        try:
+            data = await request.json()
+        except json.JSONDecodeError:
+            return web.Response(status=400)
+
+        try:
+            await self.process_update(data)
+        except Exception as e:
+            # 返回200, 避免Telegram反复重发无法解析的更新
+            print(f"[ERROR] 处理Webhook更新失败: {e}, {traceback.format_exc()}")
+        return web.Response(status=200)
+
+    async def _handle_health(self, request: web.Request) -> web.Response:
+        # 不需要鉴权, 只返回存活状态
+        return web.json_response({"status": "ok"})
+
+    async def _handle_stats(self, request: web.Request) -> web.Response:
+        if not self._authorized(request):
+            return web.Response(status=403)
+        body = {"received": self._received, "rejected": self._rejected}
+        if self.stats:
+            body["queue"] = self.stats()
+        return web.json_response(body)
+
+    async def start(self, drop_pending_updates: bool = False) -> None:
+        """启动服务器并向Telegram注册Webhook"""
+        self._runner = web.AppRunner(self.build_app())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        print(f"[INFO] Webhook服务器已启动: {self.host}:{self.port}{self.path}")
+
+        await self.application.bot.set_webhook(
+            url=self.url + self.path,
+            secret_token=self.secret_token,
+            max_connections=self.max_connections,
+            allowed_updates=Update.ALL_TYPES,
+            drop_pending_updates=drop_pending_updates,
+        )
+        print(f"[INFO] 已注册Webhook: {self.url}{self.path}, max_connections={self.max_connections}")
+
+    async def stop(self) -> None:
+        """
+        停止服务器
+
+        不删除Telegram上的Webhook, 多副本部署时其它副本还在接收更新
+        """
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
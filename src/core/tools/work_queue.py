@@ -0,0 +1,231 @@
+import asyncio
+import time
+import traceback
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+from src.core.tools.task_keeper import TaskKeeper
+from src.core.logger import logger
+
+
+class PriorityWorkQueue:
+    """
+    有界并发的优先级工作队列
+
+    - 固定数量的worker, 同时运行的任务数不会超过worker数量
+    - 数值越小优先级越高, 高优先级的任务先执行
+    - 同一优先级内按key(例如chat_id)轮询, 一个群组排队再多也不会饿死其它群组
+    - 排队总数和单个key的排队数都有上限, 超出时提交方等待空位(背压), 不丢弃任务
+    - 可选的执行通道(lane): 同一通道的任务按提交顺序逐个执行, 不同通道之间并行;
+      通道里的任务执行完后通道立即回收, 通道数量也有上限
+    """
+
+    def __init__(
+        self,
+        name: str,
+        workers: int = 8,
+        priorities: int = 3,
+        max_pending: int = 1000,
+        max_pending_per_key: int = 100,
+        max_lanes: int = 1000,
+    ):
+        self.name = name
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_pending_per_key = max_pending_per_key
+        self.max_lanes = max_lanes
+
+        # 每个优先级: key -> 任务队列, OrderedDict的顺序就是轮询顺序
+        self._queues: List["OrderedDict[Hashable, Deque[Tuple[float, Callable[[], Awaitable[Any]], Hashable]]]"] = [
+            OrderedDict() for _ in range(priorities)
+        ]
+        # 执行通道: lane -> 等待前一个任务完成的任务(key, 优先级, 提交时间, 任务)
+        # 通道存在即表示有任务在排队或执行, 同一通道同时只有一个任务在优先级队列中
+        self._lanes: Dict[Hashable, Deque[Tuple[Hashable, int, float, Callable[[], Awaitable[Any]]]]] = {}
+        self._pending = 0
+        self._pending_per_key: Dict[Hashable, int] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        # 队列已满时提交方在这里等待空位
+        self._space: Optional[asyncio.Condition] = None
+        self._waiting = 0
+        self._worker_tasks: List[asyncio.Task] = []
+
+        # 监控指标
+        self._running = 0
+        self._processed = 0
+        self._failed = 0
+        self._throttled = 0
+        self._max_wait = 0.0
+
+    def _is_full(self, key: Hashable, lane: Optional[Hashable]) -> bool:
+        """新任务是否超出排队上限"""
+        lanes_full = lane is not None and lane not in self._lanes and len(self._lanes) >= self.max_lanes
+        return (
+            self._pending >= self.max_pending
+            or self._pending_per_key.get(key, 0) >= self.max_pending_per_key
+            or lanes_full
+        )
+
+    async def submit(
+        self,
+        key: Hashable,
+        job: Callable[[], Awaitable[Any]],
+        priority: int = 0,
+        lane: Optional[Hashable] = None
+    ) -> None:
+        """
+        提交任务, 队列已满时等待空位再入队
+
+        提交方(更新分发)因此变慢, 把压力传回接收更新的一侧, 而不是丢弃消息让其跳过审核
+
+        :param key: 公平调度的分组键, 一般是chat_id
+        :param job: 返回协程的函数, 轮到执行时才创建协程
+        :param priority: 优先级, 0最高
+        :param lane: 执行通道, 同一通道的任务按提交顺序逐个执行; 为None时不限制顺序
+        """
+        self._ensure_workers()
+
+        async with self._space:
+            if self._is_full(key, lane):
+                self._throttled += 1
+                if self._waiting == 0:
+                    logger.warning(
+                        f"{self.name} 队列已满, 等待空位: key={key}, pending={self._pending}, "
+                        f"key_pending={self._pending_per_key.get(key, 0)}, lanes={len(self._lanes)}, "
+                        f"throttled={self._throttled}"
+                    )
+                self._waiting += 1
+                try:
+                    await self._space.wait_for(lambda: not self._is_full(key, lane))
+                finally:
+                    self._waiting -= 1
+
+            priority = min(max(priority, 0), len(self._queues) - 1)
+            submitted_at = time.monotonic()
+            if lane is not None and lane in self._lanes:
+                # 通道中已有任务, 等前面的任务执行完再进入优先级队列
+                self._lanes[lane].append((key, priority, submitted_at, job))
+            else:
+                if lane is not None:
+                    self._lanes[lane] = deque()
+                self._enqueue(key, priority, submitted_at, job, lane)
+
+            self._pending += 1
+            self._pending_per_key[key] = self._pending_per_key.get(key, 0) + 1
+            self._wakeup.set()
+
+    async def _notify_space(self) -> None:
+        """有任务出队或通道回收, 唤醒等待空位的提交方"""
+        if self._waiting:
+            async with self._space:
+                self._space.notify_all()
+
+    def _enqueue(
+        self,
+        key: Hashable,
+        priority: int,
+        submitted_at: float,
+        job: Callable[[], Awaitable[Any]],
+        lane: Optional[Hashable]
+    ) -> None:
+        queue = self._queues[priority].get(key)
+        if queue is None:
+            queue = self._queues[priority][key] = deque()
+        queue.append((submitted_at, job, lane))
+
+    def _release_lane(self, lane: Hashable) -> None:
+        """通道中的任务执行完成, 把下一个任务放进优先级队列; 通道空闲时回收"""
+        waiting = self._lanes.get(lane)
+        if waiting is None:
+            return
+        if not waiting:
+            del self._lanes[lane]
+            return
+        key, priority, submitted_at, job = waiting.popleft()
+        self._enqueue(key, priority, submitted_at, job, lane)
+        self._wakeup.set()
+
+    def _next_job(self) -> Optional[Tuple[Hashable, float, Callable[[], Awaitable[Any]], Hashable]]:
+        """按优先级取任务, 同一优先级内按key轮询"""
+        for queues in self._queues:
+            if not queues:
+                continue
+            key, queue = queues.popitem(last=False)
+            submitted_at, job, lane = queue.popleft()
+            # 该key还有任务, 放到队尾等下一轮
+            if queue:
+                queues[key] = queue
+            return key, submitted_at, job, lane
+        return None
+
+    def _ensure_workers(self) -> None:
+        """第一次提交任务时启动worker"""
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+            self._space = asyncio.Condition()
+        self._worker_tasks = [task for task in self._worker_tasks if not task.done()]
+        while len(self._worker_tasks) < self.workers:
+            self._worker_tasks.append(TaskKeeper.create_task(self._worker()))
+
+    async def _worker(self) -> None:
+        while True:
+            item = self._next_job()
+            if item is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            key, submitted_at, job, lane = item
+            self._pending -= 1
+            if self._pending_per_key[key] <= 1:
+                del self._pending_per_key[key]
+            else:
+                self._pending_per_key[key] -= 1
+
+            await self._notify_space()
+
+            self._max_wait = max(self._max_wait, time.monotonic() - submitted_at)
+            self._running += 1
+            try:
+                await job()
+                self._processed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._failed += 1
+                print(f"[ERROR] {self.name} 任务执行失败: {e}, {traceback.format_exc()}")
+            finally:
+                self._running -= 1
+                if lane is not None:
+                    self._release_lane(lane)
+                    await self._notify_space()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取监控指标"""
+        return {
+            "workers": self.workers,
+            "running": self._running,
+            "pending": self._pending,
+            "pending_by_priority": [
+                sum(len(queue) for queue in queues.values()) for queues in self._queues
+            ],
+            "pending_keys": len(self._pending_per_key),
+            "lanes": len(self._lanes),
+            "processed": self._processed,
+            "failed": self._failed,
+            "waiting": self._waiting,
+            "throttled": self._throttled,
+            "max_wait": round(self._max_wait, 3),
+        }
+
+    async def stop(self) -> None:
+        """停止所有worker, 丢弃未执行的任务"""
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        for queues in self._queues:
+            queues.clear()
+        self._lanes.clear()
+        self._pending = 0
+        self._pending_per_key.clear()
+        await self._notify_space()
@@ -47,7 +47,7 @@ class CreateRuleGroupHandler(AdminBaseHandler):
             "✏️ 请输入规则组描述：\n"
             "（回复此消息输入描述，发送 /skip 跳过）",
             reply_markup=InlineKeyboardMarkup([[
-                InlineKeyboardButton("跳过", callback_data=f"admin:rg:create:skip:{name}")
+                InlineKeyboardButton("跳过", callback_data=f"admin:rg:create:skip:{name:path}")
             ]])
         )
 
@@ -86,16 +86,14 @@ class CreateRuleGroupHandler(AdminBaseHandler):
                 ]])
             )
 
-    @CallbackRegistry.register(r"^admin:rg:create:skip:(.+)$")
-    async def handle_skip_description(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:create:skip:{name:path}")
+    async def handle_skip_description(self, update: Update, context: ContextTypes.DEFAULT_TYPE, name: str):
         """处理跳过描述"""
         query = update.callback_query
         if not self._is_admin(query.from_user.id):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
             
-        name = query.data.split(":")[-1]
-        
         # 创建规则组
         rule_group = await self.rule_group_service.create_rule_group(
             name=name,
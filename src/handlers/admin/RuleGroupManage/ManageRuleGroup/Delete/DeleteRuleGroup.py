@@ -14,11 +14,10 @@ class DeleteRuleGroupHandler(AdminBaseHandler):
         self.rule_group_service = RuleGroupService()
     
         
-    @CallbackRegistry.register(r"^admin:rg:.{16}:delete(:confirm)?$")
-    async def handle_delete_rule_group(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_id:rgid}:delete", "admin:rg:{rule_id:rgid}:delete:confirm")
+    async def handle_delete_rule_group(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_id: str):
         """处理删除规则组回调"""
         query = update.callback_query
-        rule_id = query.data.split(":")[2]
         
         # 检查是否是管理员
         if not self._is_admin(query.from_user.id):
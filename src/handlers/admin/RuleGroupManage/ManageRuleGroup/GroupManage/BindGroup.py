@@ -15,8 +15,8 @@ class AdminGroupBindingHandler(AdminBaseHandler):
         super().__init__()
         self.chat_service = ChatService()
 
-    @CallbackRegistry.register(r"^admin:rg:.{16}:groups:unbind:(-?\d+)$")
-    async def handle_group_unbind(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:groups:unbind:{group_id:int}")
+    async def handle_group_unbind(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str, group_id: int):
         """
         将群组从规则组中移除
         
@@ -30,9 +30,6 @@ class AdminGroupBindingHandler(AdminBaseHandler):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
             
-        group_id = int(query.data.split(":")[-1])
-        rule_group_id = query.data.split(":")[2]
-        
         try:
             await self.chat_service.unbind_chat_from_rule_group(
                 chat_id=group_id
@@ -112,8 +109,8 @@ class AdminGroupBindingHandler(AdminBaseHandler):
                     await update.message.reply_text(f"❌ 绑定失败: {str(e)}")
                 break
     
-    @CallbackRegistry.register(r"^admin:rg:.{16}:groups:bind_existing(:menu)?$")
-    async def handle_show_bind_existing_menu(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:groups:bind_existing", "admin:rg:{rule_group_id}:groups:bind_existing:menu")
+    async def handle_show_bind_existing_menu(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str):
         """
         显示群组绑定菜单
         1. 检查是否是管理员
@@ -126,8 +123,6 @@ class AdminGroupBindingHandler(AdminBaseHandler):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
         
-        rule_group_id = query.data.split(":")[2]
-        
         unbind_group_list: List[ChatInfo] = await self.chat_service.get_unbound_chats(user_id=query.from_user.id)
             
         # 将未绑定的群组, 添加到键盘
@@ -152,8 +147,8 @@ class AdminGroupBindingHandler(AdminBaseHandler):
             reply_markup=InlineKeyboardMarkup(keyboard)
         )
         
-    @CallbackRegistry.register(r"^admin:rg:.{16}:groups:bind:(-?\d+)$")
-    async def handle_group_bind(self, update:Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:groups:bind:{chat_id}")
+    async def handle_group_bind(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str, chat_id: int):
         """
         将群组绑定到规则组
         1. 检查是否是管理员
@@ -165,9 +160,6 @@ class AdminGroupBindingHandler(AdminBaseHandler):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
         
-        chat_id = int(query.data.split(":")[-1])
-        rule_group_id = query.data.split(":")[2]
-        
         await self.chat_service.bind_chat_to_rule_group(
             chat_id=chat_id,
             rule_group_id=rule_group_id
@@ -57,17 +57,14 @@ class GroupListHandler(AdminBaseHandler):
         
         return keyboard
 
-    @CallbackRegistry.register(r"^admin:rg:.{16}:groups:list:(\d+)$")
-    async def handle_group_list(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:groups:list:{page}")
+    async def handle_group_list(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str, page: int = 1):
         """处理群组列表查看"""
         query = update.callback_query
         if not self._is_admin(query.from_user.id):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
 
-        page = int(query.data.split(":")[-1]) if len(query.data.split(":")) > 5 else 1
-        rule_group_id = query.data.split(":")[2]    
-        
         # 获取所有群组
         all_groups:List[ChatInfo] = await self.chat_service.get_chats_by_rule_group(
             rule_group_id=rule_group_id
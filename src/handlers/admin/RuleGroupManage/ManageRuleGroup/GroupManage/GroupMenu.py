@@ -10,16 +10,14 @@ class GroupMenuHandler(AdminBaseHandler):
     def __init__(self):
         super().__init__()
 
-    @CallbackRegistry.register(r"^admin:rg:.{16}:groups(:menu)?$")
-    async def handle_groups(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:groups", "admin:rg:{rule_group_id}:groups:menu")
+    async def handle_groups(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str):
         """处理群组管理入口"""
         query = update.callback_query
         if not self._is_admin(query.from_user.id):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
 
-        rule_group_id = query.data.split(":")[2]
-
         keyboard = [
             [InlineKeyboardButton("群组列表", callback_data=f"admin:rg:{rule_group_id}:groups:list:1")],
             [InlineKeyboardButton("« 返回", callback_data=f"admin:rg:{rule_group_id}")]
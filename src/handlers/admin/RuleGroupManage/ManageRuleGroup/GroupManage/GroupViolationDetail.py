@@ -17,18 +17,14 @@ class GroupViolationDetailHandler(AdminBaseHandler):
         self.chat_service = ChatService()
         
         
-    @CallbackRegistry.register(r"^admin:rg:.{16}:groups:detail:(-?\d+)$")
-    async def handle_group_detail(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:groups:detail:{chat_id}")
+    async def handle_group_detail(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str, chat_id: int):
         """处理群组详情查看"""
         query = update.callback_query
         if not self._is_admin(query.from_user.id):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
 
-        # 通过回调的字段, 获取群组ID
-        rule_group_id = query.data.split(":")[2]
-        chat_id = int(query.data.split(":")[-1])
-        
         # 获取规则组内的群组信息
         rule_group_chats = await self.chat_service.get_chats_by_rule_group(rule_group_id)
         group = next((g for g in rule_group_chats if g.chat_id == chat_id), None)
@@ -78,17 +74,14 @@ class GroupViolationDetailHandler(AdminBaseHandler):
             reply_markup=InlineKeyboardMarkup(keyboard)
         )
 
-    @CallbackRegistry.register(r"^admin:rg:.{16}:groups:violations:(-?\d+):(\d+)$")
-    async def handle_group_violations(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:groups:violations:{chat_id}:{page}")
+    async def handle_group_violations(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str, chat_id: int, page: int = 1):
         """处理群组违规记录查看"""
         query = update.callback_query
         if not self._is_admin(query.from_user.id):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
 
-        chat_id = int(query.data.split(":")[-2])
-        page = int(query.data.split(":")[-1])
-        rule_group_id = query.data.split(":")[2]
         offset = (page - 1) * self.page_size
         
         # 获取群组违规记录
@@ -120,17 +113,14 @@ class GroupViolationDetailHandler(AdminBaseHandler):
             reply_markup=InlineKeyboardMarkup(keyboard)
         )
 
-    @CallbackRegistry.register(r"^admin:rg:.{16}:groups:banned:(-?\d+):(\d+)$")
-    async def handle_banned_users(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:groups:banned:{chat_id}:{page}")
+    async def handle_banned_users(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str, chat_id: int, page: int = 1):
         """处理封禁用户管理"""
         query = update.callback_query
         if not self._is_admin(query.from_user.id):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
 
-        chat_id = int(query.data.split(":")[-2])
-        page = int(query.data.split(":")[-1])
-        rule_group_id = query.data.split(":")[2]
         # 获取被封禁用户
         banned_users = await self.moderation_service.get_banned_users(chat_id)
         
@@ -166,17 +156,14 @@ class GroupViolationDetailHandler(AdminBaseHandler):
             reply_markup=InlineKeyboardMarkup(keyboard)
         )
 
-    @CallbackRegistry.register(r"^admin:rg:.{16}:groups:unban:(-?\d+):(\d+)$")
-    async def handle_unban(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:groups:unban:{chat_id}:{user_id}")
+    async def handle_unban(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str, chat_id: int, user_id: int):
         """处理解除封禁"""
         query = update.callback_query
         if not self._is_admin(query.from_user.id):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
 
-        chat_id = int(query.data.split(":")[-2])
-        user_id = int(query.data.split(":")[-1])
-        
         # 解除封禁
         result = await self.moderation_service.unban_user(user_id, chat_id)
         
@@ -186,7 +173,7 @@ class GroupViolationDetailHandler(AdminBaseHandler):
             await query.answer("❌ 解封失败", show_alert=True)
             
         # 刷新页面
-        await self.handle_banned_users(update, context)
+        await self.handle_banned_users(update, context, rule_group_id=rule_group_id, chat_id=chat_id)
 
 
 # 初始化处理器
@@ -21,11 +21,10 @@ class ManageMenuHanlder(AdminBaseHandler):
             [InlineKeyboardButton("« 返回", callback_data=f"admin:rg:list:0")]
         ])
         
-    @CallbackRegistry.register(r"^admin:rg:.{16}(:menu)?$")
-    async def handle_admin_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_id:rgid}", "admin:rg:{rule_id:rgid}:menu")
+    async def handle_admin_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_id: str):
         """处理规则组编辑主菜单"""
         query: CallbackQuery = update.callback_query
-        rule_id = query.data.split(":")[2]
         if not query or not self._is_admin(query.from_user.id):
             await query.answer("⚠️ 抱歉，您没有管理员权限。")
             return
@@ -38,11 +37,10 @@ class ManageMenuHanlder(AdminBaseHandler):
             reply_markup=self._get_admin_main_menu(rule_id)
         )
 
-    @CallbackRegistry.register(r"^admin:rg:.{16}:refresh$")
-    async def handle_refresh(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_id:rgid}:refresh")
+    async def handle_refresh(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_id: str):
         """处理刷新设置回调"""
         query = update.callback_query
-        rule_id = query.data.split(":")[2]
         if not self._is_admin(query.from_user.id):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
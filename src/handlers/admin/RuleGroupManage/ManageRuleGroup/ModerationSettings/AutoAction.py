@@ -31,15 +31,14 @@ class AutoActionHandler(AdminBaseHandler):
             )
         }
 
-    @CallbackRegistry.register(r"^admin:rg:.{16}:mo:auto$")
-    async def handle_auto_action_settings(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:mo:auto")
+    async def handle_auto_action_settings(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str):
         """处理自动处理设置回调"""
         query = update.callback_query
         if not self._is_admin(query.from_user.id):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
 
-        rule_group_id = query.data.split(":")[2]  # 获取规则组ID
         await self._load_auto_action_settings(rule_group_id)  # 加载当前规则组的设置
         
         keyboard = []
@@ -65,18 +64,14 @@ class AutoActionHandler(AdminBaseHandler):
             reply_markup=InlineKeyboardMarkup(keyboard)
         )
 
-    @CallbackRegistry.register(r"^admin:rg:.{16}:mo:auto:toggle:(\w+)$")
-    async def handle_auto_action_toggle(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:mo:auto:toggle:{action}")
+    async def handle_auto_action_toggle(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str, action: str):
         """处理自动处理开关切换"""
         query = update.callback_query
         if not self._is_admin(query.from_user.id):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
 
-        parts = query.data.split(":")
-        rule_group_id = parts[2]  # 获取规则组ID
-        action = parts[-1]  # 获取动作类型
-        
         await self._load_auto_action_settings(rule_group_id)  # 加载当前规则组的设置
 
         if action in self.auto_actions:
@@ -105,7 +100,7 @@ class AutoActionHandler(AdminBaseHandler):
             await query.answer(
                 f"已{'启用' if self.auto_actions[action] else '禁用'} {action_names[action]}"
             )
-            await self.handle_auto_action_settings(update, context)
+            await self.handle_auto_action_settings(update, context, rule_group_id=rule_group_id)
 
 # 初始化处理器
 AutoActionHandler() 
\ No newline at end of file
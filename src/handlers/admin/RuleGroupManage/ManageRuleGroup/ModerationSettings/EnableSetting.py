@@ -45,8 +45,8 @@ class EnableSettingHandler(AdminBaseHandler):
         keyboard.append([InlineKeyboardButton("« 返回", callback_data=f"admin:rg:{rule_group_id}:mo:menu")])
         return InlineKeyboardMarkup(keyboard)
         
-    @CallbackRegistry.register(r"^admin:rg:.{16}:mo:rules$")
-    async def handle_rules(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:mo:rules")
+    async def handle_rules(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str):
         """处理规则设置"""
         query = update.callback_query
         
@@ -54,8 +54,6 @@ class EnableSettingHandler(AdminBaseHandler):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
             
-        rule_group_id = query.data.split(":")[2]
-        
         # 获取当前provider
         current_provider = await rule_group_config.get_config(
             rule_group_id,
@@ -81,17 +79,14 @@ class EnableSettingHandler(AdminBaseHandler):
             reply_markup=self._get_rules_keyboard(rule_group_id, provider_categories_fix)
         )
         
-    @CallbackRegistry.register(r"^admin:rg:.{16}:mo:rules:toggle:.*$")
-    async def handle_rule_toggle(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:mo:rules:toggle:{rule_type}")
+    async def handle_rule_toggle(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str, rule_type: str):
         """处理规则开关切换"""
         query = update.callback_query
         if not self._is_admin(query.from_user.id):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
             
-        rule_group_id = query.data.split(":")[2]
-        rule_type = query.data.split(":")[-1] 
-        
         # 获取当前provider
         current_provider = await rule_group_config.get_config(
             rule_group_id,
@@ -117,7 +112,7 @@ class EnableSettingHandler(AdminBaseHandler):
         )
         
         # 刷新界面
-        await self.handle_rules(update, context)
+        await self.handle_rules(update, context, rule_group_id=rule_group_id)
 
 # 初始化处理器
 EnableSettingHandler() 
\ No newline at end of file
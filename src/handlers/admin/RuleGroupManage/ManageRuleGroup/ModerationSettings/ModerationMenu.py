@@ -14,11 +14,10 @@ class ModerationMenuHandler(AdminBaseHandler):
         super().__init__()
         self.rule_group_service = RuleGroupService()
     
-    @CallbackRegistry.register(r"^admin:rg:.{16}:mo(:menu)?$")
-    async def handle_settings(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_id:rgid}:mo", "admin:rg:{rule_id:rgid}:mo:menu")
+    async def handle_settings(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_id: str):
         """处理审核设置回调"""
         query = update.callback_query
-        rule_id = query.data.split(":")[2]
         if not self._is_admin(query.from_user.id):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
@@ -11,7 +11,7 @@ class OtherHandler(AdminBaseHandler):
     def __init__(self):
         super().__init__()
         
-    def _get_other_keyboard(self, rule_group_id: str, skip_manager: bool) -> InlineKeyboardMarkup:
+    def _get_other_keyboard(self, rule_group_id: str, skip_manager: bool, failure_mode: str) -> InlineKeyboardMarkup:
         """获取其它设置键盘"""
         keyboard = [
             [
@@ -20,47 +20,72 @@ class OtherHandler(AdminBaseHandler):
                     callback_data=f"admin:rg:{rule_group_id}:mo:other:skip_manager"
                 )
             ],
+            [
+                InlineKeyboardButton(
+                    f"审核服务不可用时: {self._failure_mode_text(failure_mode)}",
+                    callback_data=f"admin:rg:{rule_group_id}:mo:other:failure_mode"
+                )
+            ],
             [InlineKeyboardButton("« 返回设置", callback_data=f"admin:rg:{rule_group_id}:mo")]
         ]
         return InlineKeyboardMarkup(keyboard)
+    
+    @staticmethod
+    def _failure_mode_text(failure_mode: str) -> str:
+        """失败处理方式的显示文本"""
+        return "按违规处理 🔒" if failure_mode == "closed" else "放行 🔓"
+    
+    def _get_other_text(self, skip_manager: bool, failure_mode: str) -> str:
+        """获取其它设置界面的文本"""
+        text = "⚙️ 其它设置\n\n"
+        text += f"跳过管理员: {'✅' if skip_manager else '❌'}\n"
+        text += f"审核服务不可用时: {self._failure_mode_text(failure_mode)}\n"
+        return text
+    
+    async def _get_failure_mode(self, rule_group_id: str) -> str:
+        """获取审核服务不可用时的处理方式"""
+        return await rule_group_config.get_config(
+            rule_group_id,
+            configkey.moderation.other_config.FAILURE_MODE
+        ) or "open"
         
-    @CallbackRegistry.register(r"^admin:rg:.{16}:mo:other$")
-    async def handle_other(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:mo:other")
+    async def handle_other(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str):
         """处理其它设置"""
         query = update.callback_query
         if not self._is_admin(query.from_user.id):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
             
-        rule_group_id = query.data.split(":")[2]
-        
         # 获取当前其它设置
         other_config = {
             "skip_manager": await rule_group_config.get_config(
                 rule_group_id,
                 configkey.moderation.other_config.SKIP_MANAGER
-            )
+            ),
+            "failure_mode": await self._get_failure_mode(rule_group_id)
         }
         
-        text = "⚙️ 其它设置\n\n"
-        text += f"跳过管理员: {'✅' if other_config['skip_manager'] else '❌'}\n"
+        text = self._get_other_text(other_config['skip_manager'], other_config['failure_mode'])
         
         await self._safe_edit_message(
             query,
             text,
-            reply_markup=self._get_other_keyboard(rule_group_id, other_config['skip_manager'])
+            reply_markup=self._get_other_keyboard(
+                rule_group_id,
+                other_config['skip_manager'],
+                other_config['failure_mode']
+            )
         )
 
-    @CallbackRegistry.register(r"^admin:rg:.{16}:mo:other:skip_manager$")
-    async def handle_skip_manager_toggle(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:mo:other:skip_manager")
+    async def handle_skip_manager_toggle(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str):
         """处理跳过管理员开关切换"""
         query = update.callback_query
         if not self._is_admin(query.from_user.id):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
             
-        rule_group_id = query.data.split(":")[2]
-        
         # 获取当前设置
         current = await rule_group_config.get_config(
             rule_group_id,
@@ -78,13 +103,48 @@ class OtherHandler(AdminBaseHandler):
         )
         
         # 刷新其它设置界面
-        text = "⚙️ 其它设置\n\n"
+        failure_mode = await self._get_failure_mode(rule_group_id)
+        text = self._get_other_text(new_value, failure_mode)
         
         await query.answer(f"已更新为: {'✅' if new_value else '❌'}")
         await self._safe_edit_message(
             query,
             text,
-            reply_markup=self._get_other_keyboard(rule_group_id, new_value)
+            reply_markup=self._get_other_keyboard(rule_group_id, new_value, failure_mode)
+        )
+
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:mo:other:failure_mode")
+    async def handle_failure_mode_toggle(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str):
+        """处理审核服务不可用时的处理方式切换(放行/按违规处理)"""
+        query = update.callback_query
+        if not self._is_admin(query.from_user.id):
+            await query.answer("⚠️ 没有权限", show_alert=True)
+            return
+            
+        # 切换设置
+        current = await self._get_failure_mode(rule_group_id)
+        new_value = "open" if current == "closed" else "closed"
+        
+        # 更新设置
+        await rule_group_config.set_config(
+            rule_group_id,
+            configkey.moderation.other_config.FAILURE_MODE,
+            new_value
+        )
+        
+        skip_manager = await rule_group_config.get_config(
+            rule_group_id,
+            configkey.moderation.other_config.SKIP_MANAGER
+        )
+        
+        # 刷新其它设置界面
+        text = self._get_other_text(skip_manager, new_value)
+        
+        await query.answer(f"已更新为: {self._failure_mode_text(new_value)}")
+        await self._safe_edit_message(
+            query,
+            text,
+            reply_markup=self._get_other_keyboard(rule_group_id, skip_manager, new_value)
         )
 
 # 初始化处理器
@@ -30,11 +30,10 @@ class ProviderSelectHandler(AdminBaseHandler):
         ])
         return InlineKeyboardMarkup(keyboard)
     
-    @CallbackRegistry.register(r"^admin:rg:.{16}:mo:provider:list$")
-    async def provider_list_handler(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:mo:provider:list")
+    async def provider_list_handler(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str):
         """选择供应商列表"""
         query = update.callback_query
-        rule_group_id = query.data.split(":")[2]
         if not self._is_admin(query.from_user.id):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
@@ -61,17 +60,14 @@ class ProviderSelectHandler(AdminBaseHandler):
             reply_markup=self._get_provider_keyboard(rule_group_id, current_provider, provider_list)
         )
 
-    @CallbackRegistry.register(r"^admin:rg:.{16}:mo:provider:set:(\w+)$")
-    async def handle_provider_set(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:mo:provider:set:{new_provider}")
+    async def handle_provider_set(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str, new_provider: str):
         """处理Provider设置"""
         query = update.callback_query
         if not self._is_admin(query.from_user.id):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
         
-        rule_group_id = query.data.split(":")[2]
-        new_provider = query.data.split(":")[-1]
-        
         try:
             # 更新当前provider
             await rule_group_config.set_config(
@@ -83,7 +79,7 @@ class ProviderSelectHandler(AdminBaseHandler):
             await query.answer(f"✅ 已切换到 {new_provider}")
             
             # 刷新provider列表界面
-            await self.provider_list_handler(update, context)
+            await self.provider_list_handler(update, context, rule_group_id=rule_group_id)
             
         except Exception as e:
             print(f"[ERROR] 设置Provider失败: {e}")
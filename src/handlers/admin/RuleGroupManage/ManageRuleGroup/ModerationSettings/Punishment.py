@@ -48,16 +48,14 @@ class PunishmentHandler(AdminBaseHandler):
         ]
         return InlineKeyboardMarkup(keyboard)
         
-    @CallbackRegistry.register(r"^admin:rg:.{16}:mo:punishment$")
-    async def handle_punishment(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:mo:punishment")
+    async def handle_punishment(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str):
         """处理惩罚设置"""
         query = update.callback_query
         if not self._is_admin(query.from_user.id):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
             
-        rule_group_id = query.data.split(":")[2]
-        
         # 获取当前惩罚设置
         punishment = {
             "mute_duration": await rule_group_config.get_config(
@@ -137,18 +135,14 @@ class PunishmentHandler(AdminBaseHandler):
         ]
         return InlineKeyboardMarkup(keyboard)
 
-    @CallbackRegistry.register(r"^admin:rg:.{16}:mo:punishment:(mute|ban|reset|max)$")
-    async def handle_punishment_edit(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:mo:punishment:{setting_type:mute|ban|reset|max}")
+    async def handle_punishment_edit(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str, setting_type: str):
         """处理惩罚设置编辑"""
         query = update.callback_query
         if not self._is_admin(query.from_user.id):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
             
-        parts = query.data.split(":")
-        rule_group_id = parts[2]
-        setting_type = parts[-1]
-        
         # 获取当前设置
         setting_map = self._get_setting_map()
         
@@ -175,8 +169,8 @@ class PunishmentHandler(AdminBaseHandler):
             reply_markup=self._get_value_adjust_keyboard(rule_group_id, setting_type, current)
         )
 
-    @CallbackRegistry.register(r"^admin:rg:.{16}:mo:punishment:(mute|ban|reset|max):adj:(-?\d+)$")
-    async def handle_punishment_adjust(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:mo:punishment:{setting_keyword:mute|ban|reset|max}:adj:{adjustment:int}")
+    async def handle_punishment_adjust(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str, setting_keyword: str, adjustment: int):
         """处理惩罚设置调整"""
         query = update.callback_query
         if not self._is_admin(query.from_user.id):
@@ -186,11 +180,6 @@ class PunishmentHandler(AdminBaseHandler):
         # 获取配置键和当前值
         setting_map = self._get_setting_map()
         
-        parts = query.data.split(":")
-        rule_group_id = parts[2]
-        setting_keyword = parts[5] 
-        adjustment = int(parts[-1])
-        
         setting_type = setting_map[setting_keyword]
 
         current = await rule_group_config.get_config(
@@ -293,18 +282,14 @@ class PunishmentHandler(AdminBaseHandler):
             reply_markup=self._get_value_adjust_keyboard(rule_group_id, "mute", current_durations)
         )
 
-    @CallbackRegistry.register(r"^admin:rg:.{16}:mo:punishment:mute:set:(-?\d+)$")
-    async def handle_mute_duration_set(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:mo:punishment:mute:set:{duration:int}")
+    async def handle_mute_duration_set(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str, duration: int):
         """处理设置新的禁言时长"""
         query = update.callback_query
         if not self._is_admin(query.from_user.id):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
             
-        parts = query.data.split(":")
-        rule_group_id = parts[2]
-        duration = int(parts[-1])
-        
         current_durations = await rule_group_config.get_config(
             rule_group_id,
             configkey.punishment.MUTE_DURATIONS
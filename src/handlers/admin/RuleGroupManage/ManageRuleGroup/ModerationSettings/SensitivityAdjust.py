@@ -72,16 +72,14 @@ class SensitivityAdjustHandler(AdminBaseHandler):
         keyboard.append([InlineKeyboardButton("« 返回", callback_data=f"admin:rg:{rule_group_id}:mo:sen:menu")])
         return InlineKeyboardMarkup(keyboard)
 
-    @CallbackRegistry.register(r"^admin:rg:.{16}:mo:sen(:menu)?$")
-    async def handle_sensitivity(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:mo:sen", "admin:rg:{rule_group_id}:mo:sen:menu")
+    async def handle_sensitivity(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str):
         """处理敏感度设置"""
         query = update.callback_query
         if not self._is_admin(query.from_user.id):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
 
-        rule_group_id = query.data.split(":")[2]
-
         # 获取当前provider
         current_provider = await rule_group_config.get_config(
             rule_group_id,
@@ -110,17 +108,14 @@ class SensitivityAdjustHandler(AdminBaseHandler):
             reply_markup=self._get_sensitivity_keyboard(rule_group_id, provider_sensitivities_fix)
         )
 
-    @CallbackRegistry.register(r"^admin:rg:.{16}:mo:sen:adjust:(\w+)$")
-    async def handle_sensitivity_adjust(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:mo:sen:adjust:{rule_type}")
+    async def handle_sensitivity_adjust(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str, rule_type: str):
         """处理敏感度调整"""
         query = update.callback_query
         if not self._is_admin(query.from_user.id):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
 
-        rule_group_id = query.data.split(":")[2]
-        rule_type = query.data.split(":")[6]
-
         # 重构：根据当前 provider 获取对应的敏感度配置键
         current_provider = await rule_group_config.get_config(
             rule_group_id,
@@ -152,18 +147,16 @@ class SensitivityAdjustHandler(AdminBaseHandler):
             reply_markup=self._get_adjust_keyboard(rule_group_id, rule_type, current)
         )
 
-    @CallbackRegistry.register(r"^admin:rg:.{16}:mo:sen:set:(\w+):(\d*\.?\d*)$")
-    async def handle_sensitivity_set(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:mo:sen:set:{rule_type}:{value}")
+    async def handle_sensitivity_set(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str, rule_type: str, value: str):
         """处理敏感度设置"""
         query = update.callback_query
         if not self._is_admin(query.from_user.id):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
 
-        rule_group_id = query.data.split(":")[2]
-        rule_type = query.data.split(":")[-2]
         try:
-            new_value = float(query.data.split(":")[-1])
+            new_value = float(value)
             if not (0 <= new_value <= 1):
                 await query.answer("⚠️ 无效的值", show_alert=True)
                 return
@@ -184,7 +177,7 @@ class SensitivityAdjustHandler(AdminBaseHandler):
             await query.answer(f"✅ 已设置 {rule_type.upper()} 敏感度为 {new_value:.2f}")
 
             # 刷新调整界面
-            await self.handle_sensitivity_adjust(update, context)
+            await self.handle_sensitivity_adjust(update, context, rule_group_id=rule_group_id, rule_type=rule_type)
 
         except Exception as e:
             print(f"[ERROR] 设置敏感度失败: {e}")
@@ -43,16 +43,14 @@ class WarningHandler(AdminBaseHandler):
         ]
         return InlineKeyboardMarkup(keyboard)
         
-    @CallbackRegistry.register(r"^admin:rg:.{16}:mo:warning$")
-    async def handle_warning(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:mo:warning")
+    async def handle_warning(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str):
         """查看当前规则组的警告消息设置"""
         query = update.callback_query
         if not self._is_admin(query.from_user.id):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
             
-        rule_group_id = query.data.split(":")[2]
-        
         # 获取当前警告消息
         warnings = {
             "nsfw": await rule_group_config.get_config(rule_group_id, configkey.warning_messages.NSFW),
@@ -74,17 +72,14 @@ class WarningHandler(AdminBaseHandler):
             reply_markup=self._get_warning_keyboard(rule_group_id)
         )
         
-    @CallbackRegistry.register(r"^admin:rg:.{16}:mo:warning:(\w+)$")
-    async def handle_warning_edit(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:mo:warning:{rule_type}")
+    async def handle_warning_edit(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str, rule_type: str):
         """进入警告消息的编辑状态"""
         query = update.callback_query
         if not self._is_admin(query.from_user.id):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
             
-        rule_group_id = query.data.split(":")[2]
-        rule_type = query.data.split(":")[-1]
-        
         # 获取当前警告消息
         current = await rule_group_config.get_config(
             rule_group_id,
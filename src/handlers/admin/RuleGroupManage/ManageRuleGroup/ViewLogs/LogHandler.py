@@ -54,16 +54,14 @@ class AdminLogHandler(AdminBaseHandler):
         
         return keyboard
 
-    @CallbackRegistry.register(r"^admin:rg:.{16}:logs$")
-    async def handle_logs(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:logs")
+    async def handle_logs(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str):
         """处理日志查看回调"""
         query = update.callback_query
         if not self._is_admin(query.from_user.id):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
 
-        rule_group_id = query.data.split(":")[2]
-
         # 获取规则组下的所有群组
         chats = await self.chat_service.get_chats_by_rule_group(rule_group_id)
         chat_ids = [chat.chat_id for chat in chats]
@@ -93,16 +91,14 @@ class AdminLogHandler(AdminBaseHandler):
             reply_markup=InlineKeyboardMarkup(keyboard)
         )
 
-    @CallbackRegistry.register(r"^admin:rg:.{16}:logs:pending:(\d+)$")
-    async def handle_pending_logs(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:logs:pending:{page}")
+    async def handle_pending_logs(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str, page: int = 1):
         """处理待审核日志查看"""
         query = update.callback_query
         if not self._is_admin(query.from_user.id):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
 
-        rule_group_id = query.data.split(":")[2]
-        page = int(query.data.split(":")[-1])
         offset = (page - 1) * self.page_size
         
         # 获取规则组下的所有群组
@@ -164,18 +160,14 @@ class AdminLogHandler(AdminBaseHandler):
             reply_markup=InlineKeyboardMarkup(keyboard)
         )
 
-    @CallbackRegistry.register(r"^admin:rg:.{16}:logs:(approve|reject):(\d+)$")
-    async def handle_review_action(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:logs:{action:approve|reject}:{log_id}")
+    async def handle_review_action(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str, action: str, log_id: int):
         """处理审核操作"""
         query = update.callback_query
         if not self._is_admin(query.from_user.id):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
             
-        rule_group_id = query.data.split(":")[2]
-        action = query.data.split(":")[4]
-        log_id = int(query.data.split(":")[-1])
-        
         # 更新审核状态
         success = await self.moderation_log_service.update_review_status(
             log_id=log_id,
@@ -192,28 +184,22 @@ class AdminLogHandler(AdminBaseHandler):
             await query.answer("❌ 操作失败", show_alert=True)
             
         # 刷新页面
-        # 从原始的callback_data中提取页码
-        # 格式: admin:rg:{rule_group_id}:logs:pending:{page}
-        try:
-            current_page = int(query.data.split(":")[-2])  # 倒数第二个是页码
-        except (IndexError, ValueError):
-            current_page = 1  # 如果解析失败，默认第1页
+        # 审核按钮的回调数据中没有页码, 回到第1页
+        current_page = 1
         
         # 重新调用handle_pending_logs
         context.user_data["callback_query"] = query
         context.user_data["callback_data"] = f"admin:rg:{rule_group_id}:logs:pending:{current_page}"
-        await self.handle_pending_logs(update, context)
+        await self.handle_pending_logs(update, context, rule_group_id=rule_group_id, page=current_page)
 
-    @CallbackRegistry.register(r"^admin:rg:.{16}:logs:violations:(\d+)$")
-    async def handle_violations(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:logs:violations:{page}")
+    async def handle_violations(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str, page: int = 1):
         """处理违规记录查看"""
         query = update.callback_query
         if not self._is_admin(query.from_user.id):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
 
-        rule_group_id = query.data.split(":")[2]
-        
         # 获取规则组下的所有群组
         chats = await self.chat_service.get_chats_by_rule_group(rule_group_id)
         chat_ids = [chat.chat_id for chat in chats]
@@ -243,16 +229,14 @@ class AdminLogHandler(AdminBaseHandler):
             reply_markup=InlineKeyboardMarkup(keyboard)
         )
 
-    @CallbackRegistry.register(r"^admin:rg:.{16}:logs:reviews:(\d+)$")
-    async def handle_reviews(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:logs:reviews:{page}")
+    async def handle_reviews(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str, page: int = 1):
         """处理审核记录查看"""
         query = update.callback_query
         if not self._is_admin(query.from_user.id):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
 
-        rule_group_id = query.data.split(":")[2]
-        
         # 获取规则组下的所有群组
         chats = await self.chat_service.get_chats_by_rule_group(rule_group_id)
         chat_ids = [chat.chat_id for chat in chats]
@@ -284,16 +268,14 @@ class AdminLogHandler(AdminBaseHandler):
             reply_markup=InlineKeyboardMarkup(keyboard)
         )
 
-    @CallbackRegistry.register(r"^admin:rg:.{16}:logs:stats$")
-    async def handle_stats(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg:{rule_group_id}:logs:stats")
+    async def handle_stats(self, update: Update, context: ContextTypes.DEFAULT_TYPE, rule_group_id: str):
         """处理统计信息查看"""
         query = update.callback_query
         if not self._is_admin(query.from_user.id):
             await query.answer("⚠️ 没有权限", show_alert=True)
             return
             
-        rule_group_id = query.data.split(":")[2]
-        
         # 获取规则组下的所有群组
         chats = await self.chat_service.get_chats_by_rule_group(rule_group_id)
         chat_ids = [chat.chat_id for chat in chats]
@@ -88,8 +88,8 @@ class RuleGroupListHandler(AdminBaseHandler):
         return InlineKeyboardMarkup(keyboard)
 
 
-    @CallbackRegistry.register(r"^admin:rg((:list)|(:menu))?(?::(\d+))?$")
-    async def handle_list_rule_groups(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    @CallbackRegistry.route("admin:rg", "admin:rg:list", "admin:rg:menu", "admin:rg:{page}", "admin:rg:list:{page}", "admin:rg:menu:{page}")
+    async def handle_list_rule_groups(self, update: Update, context: ContextTypes.DEFAULT_TYPE, page: int = 0):
         """处理查看规则组列表"""
         query = update.callback_query
         if not self._is_admin(query.from_user.id):
@@ -97,7 +97,6 @@ class RuleGroupListHandler(AdminBaseHandler):
             return
 
         # 获取页码
-        page = int(query.data.split(":")[-1]) if type(query.data.split(":")[-1]) == int else 0
         
         # 获取规则组列表
         rule_groups = await self.rule_group_service.get_owner_rule_groups(query.from_user.id)
@@ -2,7 +2,7 @@
 from telegram import Update
 from telegram.ext import ContextTypes
 from src.core.registry.CallbackRegistry import CallbackRegistry
-from src.core.registry.MessageRegistry import MessageRegistry
+from src.core.registry.MessageRegistry import MessageRegistry, PRIORITY_IMAGE
 from src.core.registry.MessageFilters import MessageFilters
 from src.handlers.admin.AdminBase import AdminBaseHandler
 from src.core.moderation.types.ModerationTypes import ModerationInputContent, ContentType, ModerationResult
@@ -10,7 +10,11 @@ from src.core.moderation.manager import ModerationManager
 from src.core.moderation.providers.openai_moderation.openai_provider import OpenAIModerationProvider
 from src.core.moderation.config import ModerationConfig
 from src.core.Middleware.RuleGroupModerationConfigMiddleware import RuleGroupModerationConfigMiddleware
+from src.core.moderation.utils.album import AlbumCollector
+from src.core.moderation.utils.sticker import StickerProcessor, StickerFormat
+import asyncio
 import traceback
+from typing import Any, Hashable, List, Optional, Tuple
 from src.core.database.service.chatsService import ChatService
 
 class TestPhotoHandler(AdminBaseHandler):
@@ -21,6 +25,8 @@ class TestPhotoHandler(AdminBaseHandler):
         # 初始化审核管理器
         self.moderation_manager = RuleGroupModerationConfigMiddleware()
         self.chat_service = ChatService()
+        # 相册中的图片收集完整后一起审核
+        self.album_collector = AlbumCollector(self._on_album_complete, timeout=ModerationConfig.ALBUM_TIMEOUT)
         
     async def is_manager(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
         # 获取用户ID和群组ID
@@ -41,6 +47,12 @@ class TestPhotoHandler(AdminBaseHandler):
             
         # 获取rule_group_id
         chat_id = update.effective_chat.id
+        
+        # 相册中的图片先收集, 完整后作为一个整体审核
+        if update.message.media_group_id and update.message.photo:
+            self.album_collector.add((chat_id, update.message.media_group_id), (update, context))
+            return
+        
         rule_group_id = await self.chat_service.get_chat_rule_group_id(chat_id)
         
         await update.message.reply_text("🔍 正在审核图片...")
@@ -49,38 +61,82 @@ class TestPhotoHandler(AdminBaseHandler):
         is_manager = await self.is_manager(update, context)
         
         try:
-            # 如果是图片或者贴纸, 按照图片的模式去处理 -> 图片审核
-            if update.message.photo or update.message.sticker:
-                file = update.message.sticker or update.message.photo[-1]
-                file = await context.bot.get_file(file.file_id)
-                content_type = ContentType.IMAGE_URL
-                input_data = ModerationInputContent(
-                    type=content_type,
-                    image_urls=[file.file_path]
-                )
-            # 如果是视频或者gif, 按照视频的模式去处理 -> 视频审核
-            elif update.message.video or update.message.animation:
-                file = update.message.video or update.message.animation
-                file = await context.bot.get_file(file.file_id)
-                content_type = ContentType.VIDEO
-                input_data = ModerationInputContent(
-                    type=content_type,
-                    video=file.file_path
-                )
+            media = (
+                update.message.sticker
+                or (update.message.photo[-1] if update.message.photo else None)
+                or update.message.video
+                or update.message.animation
+            )
             
-            # 执行审核
-            result: ModerationResult = await self.moderation_manager.check_content(
-                rule_group_id=rule_group_id, 
-                content=input_data, 
+            sticker = update.message.sticker
+            sticker_format = StickerProcessor.detect_format(sticker) if sticker else None
+            # 贴纸按 贴纸包名 + file_unique_id 缓存
+            cache_key = StickerProcessor.cache_key(sticker) if sticker else media.file_unique_id
+            
+            # 先按 file_unique_id 查缓存, 命中则不需要下载文件
+            result: ModerationResult = await self.moderation_manager.get_cached_content_result(
+                rule_group_id=rule_group_id,
+                file_unique_id=cache_key,
                 is_manager=is_manager
+            )
+            
+            # 贴纸先查贴纸包的预扫描结果, 没有扫描过的贴纸包会在后台扫描
+            if result is None and sticker:
+                result = await self.moderation_manager.get_sticker_pack_result(
+                    rule_group_id=rule_group_id,
+                    sticker=sticker,
+                    bot=context.bot,
+                    is_manager=is_manager
                 )
+            
+            # 渐进式审核: 先审核缩略图, 结果明确时不再下载原图
+            # TGS贴纸在没有渲染器时本身就审核缩略图, 不需要预审
+            if result is None and ModerationConfig.PROGRESSIVE_ENABLED and sticker_format != StickerFormat.ANIMATED:
+                preview = self._pick_preview(update.message)
+                if preview is not None:
+                    result = await self._check_preview(rule_group_id, preview, context, is_manager)
+                    # 动图和视频贴纸的缩略图只代表一帧, 太小的缩略图看不清细节,
+                    # 这两种情况只有违规时才能代替整体的结果
+                    is_motion = update.message.animation or sticker_format == StickerFormat.VIDEO
+                    can_accept = not is_motion and self._large_enough(preview)
+                    if result is not None and not result.flagged and not can_accept:
+                        result = None
+            
+            if result is None:
+                # 贴纸按格式处理: WebP图片 / TGS渲染帧 / WEBM视频
+                if sticker:
+                    input_data = await StickerProcessor.build_content(context.bot, sticker)
+                # 如果是图片, 按照图片的模式去处理 -> 图片审核
+                elif update.message.photo:
+                    file = await context.bot.get_file(media.file_id)
+                    input_data = ModerationInputContent(
+                        type=ContentType.IMAGE_URL,
+                        image_urls=[file.file_path],
+                        extra={"file_unique_id": media.file_unique_id}
+                    )
+                # 如果是视频或者gif, 按照视频的模式去处理 -> 视频审核
+                else:
+                    file = await context.bot.get_file(media.file_id)
+                    input_data = ModerationInputContent(
+                        type=ContentType.VIDEO,
+                        video=file.file_path,
+                        extra={"file_unique_id": media.file_unique_id}
+                    )
+                
+                # 执行审核
+                result = await self.moderation_manager.check_content(
+                    rule_group_id=rule_group_id, 
+                    content=input_data, 
+                    is_manager=is_manager
+                    )
             print(result)
             
             # 格式化结果
-            text = "📋 审核结果:\n\n"
-            text += f"是否违规: {'✅ 是' if result.flagged else '❌ 否'}\n\n"
-            # if result.flagged:
-            if True:
+            if result.unavailable:
+                text = self._unavailable_text(result)
+            else:
+                text = "📋 审核结果:\n\n"
+                text += f"是否违规: {'✅ 是' if result.flagged else '❌ 否'}\n\n"
                 text += "类别:\n"
                 for category, is_flagged in result.categories.items():
                     score = result.category_scores[category]  # 用 key 来确保对应关系
@@ -97,6 +153,208 @@ class TestPhotoHandler(AdminBaseHandler):
             print(f"❌ 审核失败: {str(e)}, {traceback.format_exc()}")
             await update.message.reply_text(f"❌ 审核失败: {str(e)}")
 
+    @staticmethod
+    def _unavailable_text(result: ModerationResult) -> str:
+        """审核服务不可用时的反馈: 按规则组的设置放行或拦截, 不报告为违规"""
+        if result.flagged:
+            return "⚠️ 审核服务不可用, 已按规则组设置拦截(不计入违规)"
+        return "⚠️ 审核服务不可用, 已按规则组设置放行"
+
+    @staticmethod
+    def _merge_album_results(results: List[ModerationResult]) -> ModerationResult:
+        """相册的整体结果: 有违规取违规的, 其次取审核服务不可用的, 否则取最高分最高的"""
+        for result in results:
+            if result.flagged:
+                return result
+        for result in results:
+            if result.unavailable:
+                return result
+        return max(results, key=lambda r: max((r.category_scores or {}).values(), default=0))
+
+    @staticmethod
+    def _large_enough(size: Any) -> bool:
+        """预览图的短边是否不小于 PROGRESSIVE_MIN_EDGE, 更小的图只能用来提前判定违规"""
+        return min(size.width or 0, size.height or 0) >= ModerationConfig.PROGRESSIVE_MIN_EDGE
+
+    @classmethod
+    def _pick_preview(cls, message) -> Optional[Any]:
+        """
+        选择用于预审的小图
+        图片: 短边不小于 PROGRESSIVE_MIN_EDGE 的最小尺寸(不含原图); 贴纸/动图/视频: 缩略图
+        """
+        if message.photo:
+            for size in message.photo[:-1]:
+                if cls._large_enough(size):
+                    return size
+            return None
+        media = message.sticker or message.animation or message.video
+        return getattr(media, "thumbnail", None) if media else None
+
+    async def _check_preview(
+        self,
+        rule_group_id: str,
+        preview: Any,
+        context: ContextTypes.DEFAULT_TYPE,
+        is_manager: bool
+    ) -> Optional[ModerationResult]:
+        """
+        审核预览图
+        
+        Returns:
+            违规, 或最高分低于 PROGRESSIVE_ESCALATE_SCORE 时返回结果; 落在不确定区间时返回None, 需要审核原图
+        """
+        try:
+            result = await self.moderation_manager.get_cached_content_result(
+                rule_group_id=rule_group_id,
+                file_unique_id=preview.file_unique_id,
+                is_manager=is_manager
+            )
+            if result is None:
+                file = await context.bot.get_file(preview.file_id)
+                result = await self.moderation_manager.check_content(
+                    rule_group_id=rule_group_id,
+                    content=ModerationInputContent(
+                        type=ContentType.IMAGE_URL,
+                        image_urls=[file.file_path],
+                        extra={"file_unique_id": preview.file_unique_id}
+                    ),
+                    is_manager=is_manager
+                )
+        except Exception as e:
+            print(f"[WARNING] 预览图审核失败, 改为审核原图: {str(e)}")
+            return None
+        
+        # 审核服务不可用时的结果不能代替原图的结果
+        if result.unavailable:
+            return None
+        if result.flagged:
+            return result
+        if max(result.category_scores.values(), default=0) < ModerationConfig.PROGRESSIVE_ESCALATE_SCORE:
+            return result
+        return None
+
+    async def _on_album_complete(self, key: Hashable, items: List[Tuple[Update, Any]]):
+        """相册收集完成, 放回处理队列中审核"""
+        chat_id, _ = key
+        user = items[0][0].effective_user
+        await MessageRegistry.submit(
+            chat_id,
+            lambda: self.handle_album(items),
+            PRIORITY_IMAGE,
+            MessageRegistry.lane_key(chat_id, user.id if user else None)
+        )
+
+    async def handle_album(self, items: List[Tuple[Update, Any]]):
+        """
+        审核整个相册: 每张图片分别审核(可复用缓存), 只回复一次, 违规时一起删除
+        """
+        update, context = items[0]
+        chat_id = update.effective_chat.id
+        rule_group_id = await self.chat_service.get_chat_rule_group_id(chat_id)
+        
+        await update.message.reply_text(f"🔍 正在审核相册({len(items)}张图片)...")
+        
+        # 获取是否是管理员
+        is_manager = await self.is_manager(update, context)
+        
+        try:
+            photos = [item_update.message.photo[-1] for item_update, _ in items]
+            
+            # 先按 file_unique_id 查缓存, 已知违规的图片可以直接判定整个相册
+            cached_results = await asyncio.gather(*(
+                self.moderation_manager.get_cached_content_result(
+                    rule_group_id=rule_group_id,
+                    file_unique_id=photo.file_unique_id,
+                    is_manager=is_manager
+                )
+                for photo in photos
+            ))
+            result = next((r for r in cached_results if r is not None and r.flagged), None)
+            
+            uncached = [photo for photo, cached in zip(photos, cached_results) if cached is None]
+            if result is None and uncached:
+                files = await asyncio.gather(*(context.bot.get_file(photo.file_id) for photo in uncached))
+                # 每张图片单独审核, 按各自的 file_unique_id 写入结果缓存
+                checked = await asyncio.gather(*(
+                    self.moderation_manager.check_content(
+                        rule_group_id=rule_group_id,
+                        content=ModerationInputContent(
+                            type=ContentType.IMAGE_URL,
+                            image_urls=[file.file_path],
+                            extra={
+                                "file_unique_id": photo.file_unique_id,
+                                "media_group_id": update.message.media_group_id
+                            }
+                        ),
+                        is_manager=is_manager
+                    )
+                    for photo, file in zip(uncached, files)
+                ))
+                result = self._merge_album_results(
+                    [r for r in cached_results if r is not None] + list(checked)
+                )
+            if result is None:
+                result = self._merge_album_results(cached_results)
+            
+            # 格式化结果
+            if result.unavailable:
+                text = self._unavailable_text(result)
+            else:
+                text = "📋 相册审核结果:\n\n"
+                text += f"是否违规: {'✅ 是' if result.flagged else '❌ 否'}\n\n"
+                text += "类别:\n"
+                for category, is_flagged in result.categories.items():
+                    text += f"- {category}: {result.category_scores[category]:.2%}\n"
+            
+            # 整个相册只反馈一次
+            await update.message.reply_text(text)
+            
+            # 如果违规, 一起删除相册的所有消息
+            if result.flagged:
+                await context.bot.delete_messages(
+                    chat_id=chat_id,
+                    message_ids=[item_update.message.message_id for item_update, _ in items]
+                )
+            
+        except Exception as e:
+            print(f"❌ 相册审核失败: {str(e)}, {traceback.format_exc()}")
+            await update.message.reply_text(f"❌ 审核失败: {str(e)}")
+
+    @MessageRegistry.register(MessageFilters.match_group_text())  # 群组文本, 其它处理器都不匹配时才处理
+    async def handle_text(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """处理群组文本消息: 先经过本地关键词预过滤, 未命中再交给规则组的provider"""
+        if not self._is_admin(update.effective_user.id):
+            return
+
+        chat_id = update.effective_chat.id
+        rule_group_id = await self.chat_service.get_chat_rule_group_id(chat_id)
+
+        # 获取是否是管理员
+        is_manager = await self.is_manager(update, context)
+
+        try:
+            result = await self.moderation_manager.check_content(
+                rule_group_id=rule_group_id,
+                content=ModerationInputContent(type=ContentType.TEXT, text=update.message.text),
+                is_manager=is_manager
+            )
+
+            # 文本消息很多, 只在违规或审核服务不可用时反馈
+            if result.unavailable:
+                await update.message.reply_text(self._unavailable_text(result))
+            elif result.flagged:
+                text = "📋 审核结果:\n\n违规类别:\n"
+                for category, is_flagged in result.categories.items():
+                    if is_flagged:
+                        text += f"- {category}: {result.category_scores.get(category, 0):.2%}\n"
+                await update.message.reply_text(text)
+
+            if result.flagged:
+                await context.bot.delete_message(chat_id=chat_id, message_id=update.message.message_id)
+
+        except Exception as e:
+            print(f"❌ 文本审核失败: {str(e)}, {traceback.format_exc()}")
+
     @MessageRegistry.register(MessageFilters.match_media_type(['video']))  # 直接注册图片消息处理器
     async def handle_video(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """处理视频消息"""
@@ -114,22 +372,42 @@ class TestPhotoHandler(AdminBaseHandler):
         
         try:
             video = update.message.video
-            file = await context.bot.get_file(video.file_id)
             
-            # 创建审核输入
-            input_data = ModerationInputContent(
-                type=ContentType.VIDEO,
-                video=file.file_path
+            # 先按 file_unique_id 查缓存, 命中则不需要下载视频
+            result: ModerationResult = await self.moderation_manager.get_cached_content_result(
+                rule_group_id=rule_group_id,
+                file_unique_id=video.file_unique_id,
+                is_manager=is_manager
             )
             
-            # 执行审核
-            result: ModerationResult = await self.moderation_manager.check_content(
-                rule_group_id=rule_group_id, 
-                content=input_data, 
-                is_manager=is_manager
+            # 渐进式审核: 先审核视频缩略图, 结果明确违规时不再下载视频
+            if result is None and ModerationConfig.PROGRESSIVE_ENABLED and video.thumbnail:
+                preview_result = await self._check_preview(rule_group_id, video.thumbnail, context, is_manager)
+                if preview_result is not None and preview_result.flagged:
+                    result = preview_result
+            
+            if result is None:
+                file = await context.bot.get_file(video.file_id)
+                
+                # 创建审核输入
+                input_data = ModerationInputContent(
+                    type=ContentType.VIDEO,
+                    video=file.file_path,
+                    extra={"file_unique_id": video.file_unique_id}
                 )
+                
+                # 执行审核
+                result = await self.moderation_manager.check_content(
+                    rule_group_id=rule_group_id, 
+                    content=input_data, 
+                    is_manager=is_manager
+                    )
             
             # 格式化结果
+            if result.unavailable:
+                await update.message.reply_text(self._unavailable_text(result))
+                return
+            
             text = "📋 审核结果:\n\n"
             text += f"是否违规: {'✅ 是' if result.flagged else '❌ 否'}\n\n"
             